@@ -7,5 +7,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_client.settings')
+os.environ.setdefault('TRANSFER_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -2,6 +2,7 @@
 Django settings for django_client project.
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -33,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'transfer_app.middleware.PerfMiddleware',
+    'transfer_app.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -48,7 +51,8 @@ ROOT_URLCONF = 'django_client.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for PerfMiddleware
+        'BACKEND': 'transfer_app.perf.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -57,6 +61,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'transfer_app.context_processors.push',
             ],
         },
     },
@@ -83,6 +88,31 @@ DATABASES = {
     }
 }
 
+# Read replica for the list/report views (see transfer_app/replicas.py):
+# set TRANSFER_DB_REPLICA_HOST to a MySQL replica of `default`.
+if os.environ.get('TRANSFER_DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'], HOST=os.environ['TRANSFER_DB_REPLICA_HOST'], TEST={'MIRROR': 'default'}
+    )
+
+# Local stand-in: two SQLite files as primary and replica ("replicate" by
+# copying db.sqlite3 over replica.sqlite3).
+if os.environ.get('TRANSFER_LOCAL_REPLICA') == '1':
+    DATABASES = {
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'db.sqlite3'},
+        'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3',
+                    'TEST': {'MIRROR': 'default'}},
+    }
+
+DATABASE_ROUTERS = ['transfer_app.replicas.ReplicaRouter']
+TRANSFER_READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+# After a user's own write, their reads stay on the primary this long
+TRANSFER_REPLICA_STICKY_SECONDS = 10
+
+
+# Loads the user's UserProfile in the same query as the user, so the role is read
+# from the database on every request (see transfer_app/backends.py)
+AUTHENTICATION_BACKENDS = ['transfer_app.backends.ProfileModelBackend']
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -127,6 +157,65 @@ STATIC_ROOT = BASE_DIR / 'static_root'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cached counts, fragment versions and rendered dashboard blocks must be seen
+# by every worker process: set TRANSFER_REDIS_URL (redis://host:6379/0, needs
+# the redis package) in production. Without it each process keeps its own
+# local-memory cache, which is fine for a single dev server.
+if os.environ.get('TRANSFER_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['TRANSFER_REDIS_URL'],
+            'KEY_PREFIX': 'cns',
+        }
+    }
+
+# Dashboard row counts: exact counts are cached per filter set for this many
+# seconds; unfiltered listings above the threshold show a statistics estimate.
+TRANSFER_COUNT_CACHE_TTL = 30
+TRANSFER_COUNT_ESTIMATE_THRESHOLD = 10000
+
+# Rendered dashboard batch blocks are cached per batch version for up to this
+# many seconds (see CACHES above).
+TRANSFER_FRAGMENT_CACHE_TTL = 24 * 60 * 60
+
+# archive_requests moves batches whose requests all finished (confirmed,
+# rejected or canceled) at least this many days ago into the archive tables.
+TRANSFER_ARCHIVE_AFTER_DAYS = 90
+
+# The change feed (/api/v1/events/) only serves events at least this many
+# seconds old, so ids of transactions still committing are not skipped.
+TRANSFER_EVENT_SETTLE_SECONDS = 5
+
+# Fraction of requests PerfMiddleware times (Server-Timing header plus a JSON
+# line on the transfer_app.perf logger); a query shape repeated this many
+# times in one request is logged as a likely N+1.
+TRANSFER_PERF_SAMPLE_RATE = float(os.environ.get('TRANSFER_PERF_SAMPLE_RATE', '0.01'))
+TRANSFER_PERF_N_PLUS_ONE_THRESHOLD = 5
+
+# Seconds a bulk action's result page stays available (see bulk_results.py)
+TRANSFER_BULK_RESULT_TTL = 3600
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'transfer_app.perf': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Route the dashboard and the full-list views to their async variants, which
+# run independent queries concurrently. asgi.py turns this on; WSGI keeps the
+# sync views.
+TRANSFER_ASYNC_VIEWS = os.environ.get('TRANSFER_ASYNC_VIEWS') == '1'
+
+# SSE notifications (/notifications/, ASGI only): each worker reads new
+# TransferEvents at most this many seconds after another worker wrote them.
+TRANSFER_PUSH_POLL_SECONDS = 2
+
 # Authentication
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
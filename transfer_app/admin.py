@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import UserProfile, Group, Batch, TransferRequest
+from . import counters, events
+from .models import UserProfile, Group, Batch, TransferRequest, StatusCounter, TransferEvent
 
 
 @admin.register(UserProfile)
@@ -29,6 +30,12 @@ class BatchAdmin(admin.ModelAdmin):
     search_fields = ("batch_number", "description", "created_by__username", "designated_lead__username")
     inlines = [TransferInline]
 
+    def save_model(self, request, obj, form, change):
+        old_lead = Batch.objects.filter(pk=obj.pk).values_list('designated_lead_id', flat=True).first() if change else None
+        super().save_model(request, obj, form, change)
+        if change and old_lead != obj.designated_lead_id:
+            counters.refresh(StatusCounter.SCOPE_LEAD, [old_lead, obj.designated_lead_id])
+
 
 @admin.register(TransferRequest)
 class TransferRequestAdmin(admin.ModelAdmin):
@@ -43,4 +50,18 @@ class TransferRequestAdmin(admin.ModelAdmin):
         "requested_by__username", "approved_by__username", "confirmed_by__username",
         "batch__batch_number",
     )
-    autocomplete_fields = ("batch", "requested_by", "approved_by", "confirmed_by")
\ No newline at end of file
+    autocomplete_fields = ("batch", "requested_by", "approved_by", "confirmed_by")
+
+    def save_model(self, request, obj, form, change):
+        # Status, batch or requester may all change here: recompute the owners involved
+        old = TransferRequest.objects.filter(pk=obj.pk).values(
+            'batch_id', 'batch__designated_lead_id', 'requested_by_id', 'status'
+        ).first() if change else None
+        super().save_model(request, obj, form, change)
+        if old:
+            new = counters.request_row(obj, obj.batch.designated_lead_id if obj.batch_id else None)
+            for scope, field in counters.SCOPE_FIELDS.items():
+                counters.refresh(scope, [old[field], new[field]])
+            events.record(
+                TransferEvent.KIND_UPDATED, obj.pk, obj.batch_id, old['status'], obj.status, request.user.id
+            )
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""Read-only JSON API (v1) for transfer requests and batches.
+
+Responses carry an ETag and Last-Modified derived from `updated_at`, which
+is read with a narrow query before anything is serialized, so an unchanged
+poll is answered with 304 straight away. ?fields=a,b,c selects a compact
+subset of fields; lists are keyset-paginated like the dashboard cursor mode.
+/events/ is the change feed: TransferEvents after ?since=<last id seen>.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from . import archive, events
+from .replicas import read_replica
+from .models import Batch, TransferRequest
+from .pagination import KeysetPaginator
+from .views import filter_requests, read_dashboard_filters
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+
+REQUEST_FIELDS = {
+    'id': 'id',
+    'batch_id': 'batch_id',
+    'batch_number': 'batch__batch_number',
+    'msnv': 'msnv',
+    'from_code': 'from_code',
+    'to_code': 'to_code',
+    'effective_date': 'effective_date',
+    'is_permanent': 'is_permanent',
+    'status': 'status',
+    'requested_by': 'requested_by__username',
+    'approved_by': 'approved_by__username',
+    'approved_at': 'approved_at',
+    'confirmed_by': 'confirmed_by__username',
+    'confirmed_at': 'confirmed_at',
+    'rejected_by': 'rejected_by__username',
+    'rejected_at': 'rejected_at',
+    'rejection_reason': 'rejection_reason',
+    'canceled_by': 'canceled_by__username',
+    'canceled_at': 'canceled_at',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+BATCH_FIELDS = {
+    'id': 'id',
+    'batch_number': 'batch_number',
+    'description': 'description',
+    'created_by': 'created_by__username',
+    'designated_lead': 'designated_lead__username',
+    'created_at': 'created_at',
+}
+
+
+def api_login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'authentication required'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def selected_fields(request, available):
+    """Names from ?fields= that exist in `available` (all of them if absent)."""
+    wanted = [f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()]
+    names = [f for f in wanted if f in available] or list(available)
+    if 'id' not in names:
+        names.insert(0, 'id')
+    return names
+
+
+def project(qs, names, available):
+    lookups = [available[name] for name in names]
+    for values in qs.values_list(*lookups):
+        yield dict(zip(names, values))
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def conditional(request, etag, last_modified):
+    """304/412 response if the client's validators still match, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def page_size(request):
+    try:
+        return min(max(int(request.GET.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return API_PAGE_SIZE
+
+
+@require_safe
+@api_login_required
+@read_replica
+def request_list(request):
+    names = selected_fields(request, REQUEST_FIELDS)
+    qs = filter_requests(TransferRequest.objects.all(), read_dashboard_filters(request.GET))
+    if request.GET.get('batch'):
+        try:
+            qs = qs.filter(batch_id=int(request.GET['batch']))
+        except ValueError:
+            return JsonResponse({'error': 'batch must be a batch id'}, status=400)
+    page = KeysetPaginator(qs.only('id', 'created_at', 'updated_at'), 'created_at', page_size(request)).get_page(
+        request.GET.get('cursor')
+    )
+    versions = [(tr.id, tr.updated_at) for tr in page]
+    last_modified = max((u for _, u in versions), default=None)
+    etag = make_etag('requests', names, page.next_cursor, versions)
+    response = conditional(request, etag, last_modified)
+    if response is None:
+        rows = {row['id']: row for row in project(
+            TransferRequest.objects.filter(id__in=[i for i, _ in versions]), names, REQUEST_FIELDS
+        )}
+        response = JsonResponse({
+            'results': [rows[i] for i, _ in versions if i in rows],
+            'next': page.next_cursor or None,
+            'previous': page.previous_cursor or None,
+        })
+    return with_validators(response, etag, last_modified)
+
+
+@require_safe
+@api_login_required
+@read_replica
+def request_detail(request, request_id):
+    names = selected_fields(request, REQUEST_FIELDS)
+    # Finished requests may have moved to the archive (same id, same field names)
+    for model in archive.REQUEST_MODELS:
+        updated_at = model.objects.filter(id=request_id).values_list('updated_at', flat=True).first()
+        if updated_at is not None:
+            break
+    else:
+        raise Http404('No request with this id')
+    etag = make_etag('request', request_id, names, updated_at)
+    response = conditional(request, etag, updated_at)
+    if response is None:
+        row = next(project(model.objects.filter(id=request_id), names, REQUEST_FIELDS))
+        response = JsonResponse(row)
+    return with_validators(response, etag, updated_at)
+
+
+@require_safe
+@api_login_required
+@read_replica
+def batch_list(request):
+    names = selected_fields(request, BATCH_FIELDS)
+    page = KeysetPaginator(
+        Batch.objects.only('id', 'created_at', 'description', 'designated_lead_id'), 'created_at', page_size(request)
+    ).get_page(request.GET.get('cursor'))
+    ids = [b.id for b in page]
+    own = {b.id: (b.description, b.designated_lead_id) for b in page}
+    # A batch changes when any of its requests does
+    stats = {
+        row['batch_id']: (row['n'], row['last'])
+        for row in TransferRequest.objects.filter(batch_id__in=ids).order_by()
+        .values('batch_id').annotate(n=Count('id'), last=Max('updated_at'))
+    }
+    versions = [(bid, stats.get(bid), own[bid]) for bid in ids]
+    last_modified = max((s[1] for _, s, _ in versions if s), default=None)
+    etag = make_etag('batches', names, page.next_cursor, versions)
+    response = conditional(request, etag, last_modified)
+    if response is None:
+        rows = {row['id']: row for row in project(Batch.objects.filter(id__in=ids), names, BATCH_FIELDS)}
+        results = []
+        for bid, stat, _ in versions:
+            row = rows[bid]
+            row['request_count'] = stat[0] if stat else 0
+            results.append(row)
+        response = JsonResponse({
+            'results': results,
+            'next': page.next_cursor or None,
+            'previous': page.previous_cursor or None,
+        })
+    return with_validators(response, etag, last_modified)
+
+
+@require_safe
+@api_login_required
+@read_replica
+def batch_detail(request, batch_id):
+    """One batch with all of its requests (?fields= applies to the requests)."""
+    # An archived batch moved whole, with its requests and ids
+    for model in archive.BATCH_MODELS:
+        batch = model.objects.only('id', 'description', 'designated_lead_id').filter(id=batch_id).first()
+        if batch is not None:
+            break
+    else:
+        raise Http404('No batch with this id')
+    stat = batch.requests.order_by().aggregate(n=Count('id'), last=Max('updated_at'))
+    names = selected_fields(request, REQUEST_FIELDS)
+    etag = make_etag('batch', batch.id, batch.description, batch.designated_lead_id, names, stat['n'], stat['last'])
+    response = conditional(request, etag, stat['last'])
+    if response is None:
+        data = next(project(model.objects.filter(id=batch.id), list(BATCH_FIELDS), BATCH_FIELDS))
+        data['requests'] = list(project(batch.requests.order_by('id'), names, REQUEST_FIELDS))
+        response = JsonResponse(data)
+    return with_validators(response, etag, stat['last'])
+
+
+@require_safe
+@api_login_required
+@read_replica
+def event_feed(request):
+    """Events after ?since= in sequence order; resume from `next` until `more` is false."""
+    try:
+        since = max(int(request.GET.get('since', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': 'since must be an event id'}, status=400)
+    rows, next_cursor, more = events.feed(since, page_size(request))
+    return JsonResponse({'results': rows, 'next': next_cursor, 'more': more})
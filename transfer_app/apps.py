@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TransferAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transfer_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import perf  # noqa: F401  (query timer on every new DB connection)
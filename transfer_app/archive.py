@@ -0,0 +1,212 @@
+"""Hot/cold archival of finished transfer requests.
+
+archive_finished() moves every batch whose requests are all CONFIRMED,
+REJECTED or CANCELED and untouched for TRANSFER_ARCHIVE_AFTER_DAYS (plus such
+requests without a batch) into ArchivedBatch / ArchivedTransferRequest, one
+chunk per transaction, so the tables and indexes the dashboard reads only
+hold live and recent work. A batch always moves whole, and rows keep their
+ids: TransferEvents and the MSNV/description search terms still point at
+them, so filter_requests() works on the archive as it is.
+
+Readers that take an id (view_request, the API details) go through
+find_request() / REQUEST_MODELS / BATCH_MODELS, exports read the hot table and then the
+archive, and the "my requests" full lists page over both through HotAndCold;
+the dashboard and the inboxes stay hot-only.
+"""
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from . import counters, counts
+from .models import ArchivedBatch, ArchivedTransferRequest, Batch, StatusCounter, TransferRequest
+
+TERMINAL_STATUSES = ('CONFIRMED', 'REJECTED', 'CANCELED')
+ARCHIVE_AFTER_DAYS = getattr(settings, 'TRANSFER_ARCHIVE_AFTER_DAYS', 90)
+BATCH_CHUNK_SIZE = 200
+REQUEST_CHUNK_SIZE = 1000
+
+# Hot table first: most reads hit live rows
+REQUEST_MODELS = (TransferRequest, ArchivedTransferRequest)
+BATCH_MODELS = (Batch, ArchivedBatch)
+
+BATCH_COPY_FIELDS = [f.attname for f in ArchivedBatch._meta.concrete_fields if f.name != 'archived_at']
+REQUEST_COPY_FIELDS = [f.attname for f in ArchivedTransferRequest._meta.concrete_fields if f.name != 'archived_at']
+
+
+def find_request(request_id, related=()):
+    """The TransferRequest with this id, else its archived copy, else None."""
+    for model in REQUEST_MODELS:
+        found = model.objects.select_related(*related).filter(id=request_id).first()
+        if found is not None:
+            return found
+    return None
+
+
+class HotAndCold:
+    """A hot queryset and its archived twin, read as one list in the hot one's ordering.
+
+    Implements what Paginator and KeysetPaginator use: filter() and order_by()
+    apply to both parts, count() adds them up, and [start:stop] reads the first
+    `stop` rows of each part and merges them, so a page is one index range scan
+    per table. Archival does not split by the sort key (a busy batch keeps old
+    rows hot), hence the merge rather than hot rows first.
+    """
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def filter(self, *args, **kwargs):
+        return HotAndCold(*(qs.filter(*args, **kwargs) for qs in self.parts))
+
+    def order_by(self, *fields):
+        return HotAndCold(*(qs.order_by(*fields) for qs in self.parts))
+
+    def count(self):
+        return sum(qs.count() for qs in self.parts)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None or index.stop is None:
+            raise TypeError('HotAndCold only supports [start:stop] slices')
+        fields = self.parts[0].query.order_by
+        names = [f.lstrip('-') for f in fields]
+
+        def sort_key(row):
+            # NULLs sort lowest, as on MySQL and SQLite
+            return tuple((getattr(row, n) is not None, getattr(row, n)) for n in names)
+
+        merged = heapq.merge(
+            *(list(qs[:index.stop]) for qs in self.parts), key=sort_key, reverse=fields[0].startswith('-')
+        )
+        return list(islice(merged, index.start or 0, index.stop))
+
+
+def cutoff_for(days=None):
+    return timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS if days is None else days)
+
+
+def newest_ids():
+    # The newest rows stay hot: InnoDB before MySQL 8 re-derives AUTO_INCREMENT
+    # from MAX(id) on restart and could hand an archived id out again.
+    return (
+        Batch.objects.aggregate(m=Max('id'))['m'] or 0,
+        TransferRequest.objects.aggregate(m=Max('id'))['m'] or 0,
+    )
+
+
+def finished_batches(cutoff):
+    """Ids of batches that can move: created before `cutoff`, every request terminal and older."""
+    newest_batch, newest_request = newest_ids()
+    return (
+        Batch.objects.filter(created_at__lt=cutoff, id__lt=newest_batch)
+        .annotate(
+            live=Count('requests', filter=~Q(requests__status__in=TERMINAL_STATUSES) | Q(requests__updated_at__gte=cutoff)),
+            top=Max('requests__id'),
+        )
+        .filter(live=0)
+        .filter(Q(top__lt=newest_request) | Q(top__isnull=True))
+        .order_by('id').values_list('id', flat=True)
+    )
+
+
+def loose_requests(cutoff):
+    """Ids of finished requests that belong to no batch."""
+    _, newest_request = newest_ids()
+    return (
+        TransferRequest.objects.filter(
+            batch__isnull=True, status__in=TERMINAL_STATUSES, updated_at__lt=cutoff, id__lt=newest_request
+        ).order_by('id').values_list('id', flat=True)
+    )
+
+
+def delete_rows(model, ids):
+    """DELETE by id, bypassing the collector: its per-row signals would log the rows as deleted."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), REQUEST_CHUNK_SIZE):
+            chunk = ids[start:start + REQUEST_CHUNK_SIZE]
+            cursor.execute(f'DELETE FROM {table} WHERE id IN ({", ".join(["%s"] * len(chunk))})', chunk)
+
+
+def move_requests(rows, leads):
+    """Copy locked request value dicts to the archive, drop them from the hot table and its counters."""
+    ArchivedTransferRequest.objects.bulk_create(
+        [ArchivedTransferRequest(**{f: row[f] for f in REQUEST_COPY_FIELDS}) for row in rows],
+        batch_size=REQUEST_CHUNK_SIZE,
+    )
+    counters.record_removed([
+        {'batch_id': row['batch_id'], 'batch__designated_lead_id': leads.get(row['batch_id']),
+         'requested_by_id': row['requested_by_id'], 'status': row['status']}
+        for row in rows
+    ])
+    delete_rows(TransferRequest, [row['id'] for row in rows])
+
+
+def archive_batches(batch_ids, cutoff):
+    """Move these batches with their requests; returns (batches, requests) moved."""
+    with transaction.atomic():
+        batches = list(Batch.objects.select_for_update().filter(id__in=batch_ids).order_by('id'))
+        rows = list(
+            TransferRequest.objects.select_for_update().filter(batch_id__in=batch_ids)
+            .order_by('id').values(*REQUEST_COPY_FIELDS)
+        )
+        # Re-check under the locks: a request may have changed since the scan
+        busy = {row['batch_id'] for row in rows if row['status'] not in TERMINAL_STATUSES or row['updated_at'] >= cutoff}
+        batches = [b for b in batches if b.id not in busy]
+        rows = [row for row in rows if row['batch_id'] not in busy]
+        if not batches:
+            return 0, 0
+        ArchivedBatch.objects.bulk_create([ArchivedBatch(**{f: getattr(b, f) for f in BATCH_COPY_FIELDS}) for b in batches])
+        move_requests(rows, {b.id: b.designated_lead_id for b in batches})
+        moved = [b.id for b in batches]
+        StatusCounter.objects.filter(scope=StatusCounter.SCOPE_BATCH, owner_id__in=moved).delete()
+        delete_rows(Batch, moved)
+        transaction.on_commit(counts.invalidate)
+    return len(batches), len(rows)
+
+
+def archive_loose(request_ids, cutoff):
+    with transaction.atomic():
+        rows = list(
+            TransferRequest.objects.select_for_update()
+            .filter(id__in=request_ids, batch__isnull=True, status__in=TERMINAL_STATUSES, updated_at__lt=cutoff)
+            .order_by('id').values(*REQUEST_COPY_FIELDS)
+        )
+        if rows:
+            move_requests(rows, {})
+            transaction.on_commit(counts.invalidate)
+    return len(rows)
+
+
+def archive_finished(days=None, batch_chunk=BATCH_CHUNK_SIZE, request_chunk=REQUEST_CHUNK_SIZE, progress=None):
+    """Archive everything finished before the cutoff; returns (batches, requests) moved.
+
+    `progress(batches, requests)` is called with the running totals after each chunk.
+    """
+    cutoff = cutoff_for(days)
+    total_batches = total_requests = 0
+    last_id = 0
+    while True:
+        ids = list(finished_batches(cutoff).filter(id__gt=last_id)[:batch_chunk])
+        if not ids:
+            break
+        last_id = ids[-1]
+        moved_batches, moved_requests = archive_batches(ids, cutoff)
+        total_batches += moved_batches
+        total_requests += moved_requests
+        if progress:
+            progress(total_batches, total_requests)
+    last_id = 0
+    while True:
+        ids = list(loose_requests(cutoff).filter(id__gt=last_id)[:request_chunk])
+        if not ids:
+            break
+        last_id = ids[-1]
+        total_requests += archive_loose(ids, cutoff)
+        if progress:
+            progress(total_batches, total_requests)
+    return total_batches, total_requests
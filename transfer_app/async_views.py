@@ -0,0 +1,178 @@
+"""Async variants of the dashboard and the full-list views, served under ASGI.
+
+The ORM is synchronous, so every independent query of a page (the count,
+the page rows, the role widgets, the filter options) runs in its own worker
+thread with its own database connection and they are awaited together; the
+page then costs roughly its slowest query instead of the sum of all of them.
+Templates are still rendered in the request's sync thread. Under WSGI the
+plain views in views.py are routed instead (see TRANSFER_ASYNC_VIEWS).
+notifications() is the Server-Sent Events stream of push.py.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import Page
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+
+from . import counts, push
+from .replicas import read_replica
+from .pagination import CountedPaginator, EstimatedPaginator, KeysetPaginator
+from .views import (
+    FULL_LISTS, FULL_LIST_PAGE_SIZE, dashboard_batches, dashboard_context, dashboard_queryset,
+    filter_options, full_list_context, full_list_rows, get_profile, read_dashboard_params,
+    role_sections, use_cursor_paging,
+)
+
+
+def in_worker(fn):
+    """Run `fn` off the event loop in a pool thread with its own DB connection.
+
+    The connection is opened and released the way a request would (honouring
+    CONN_MAX_AGE), so worker threads don't keep idle connections around.
+    """
+    @wraps(fn)
+    def call(*args):
+        close_old_connections()
+        try:
+            return fn(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False)
+
+
+def run_query(fn, *args):
+    return in_worker(fn)(*args)
+
+
+def slice_rows(qs, page_num, per_page):
+    """The rows of page `page_num`, plus the first row of the next page if there is one."""
+    offset = (page_num - 1) * per_page
+    return list(qs[offset:offset + per_page + 1])
+
+
+def exact_count(qs):
+    return qs.count(), False
+
+
+async def fetch_page(qs, page_num, per_page, count_fn):
+    """Offset page whose COUNT and row query run concurrently.
+
+    `count_fn()` returns (count, is_estimate). With an exact count an
+    out-of-range page number falls back to the last page like
+    Paginator.get_page, at the cost of one more row query; an estimate is
+    only a label and paging goes by the extra row (see EstimatedPaginator).
+    """
+    page_num = max(page_num, 1)
+    (count, is_estimate), rows = await asyncio.gather(
+        run_query(count_fn),
+        run_query(slice_rows, qs, page_num, per_page),
+    )
+    if is_estimate:
+        paginator = EstimatedPaginator(qs, per_page, count)
+        return paginator.page(rows, page_num), paginator, is_estimate
+    paginator = CountedPaginator(qs, per_page, count)
+    if page_num > paginator.num_pages:
+        page_num = paginator.num_pages
+        rows = await run_query(slice_rows, qs, page_num, per_page)
+    return Page(rows[:per_page], page_num, paginator), paginator, is_estimate
+
+
+def auth_profile(request):
+    """(is_authenticated, profile); touches the lazy request.user, so call it via sync_to_async."""
+    if not request.user.is_authenticated:
+        return False, None
+    return True, get_profile(request.user)
+
+
+@read_replica
+async def dashboard(request):
+    authenticated, _ = await sync_to_async(auth_profile)(request)
+    if not authenticated:
+        return redirect('transfer_app:login')
+
+    params = read_dashboard_params(request)
+    filters = params['filters']
+    qs = dashboard_queryset(filters)
+
+    if params['batch_mode']:
+        batch_qs = dashboard_batches(qs, filters)
+        listing = fetch_page(batch_qs, params['page_num'], params['page_size'], lambda: exact_count(batch_qs))
+    elif params['cursor_mode']:
+        listing = run_query(KeysetPaginator(qs, 'created_at', params['page_size']).get_page, params['cursor'])
+    else:
+        listing = fetch_page(
+            qs, params['page_num'], params['page_size'], lambda: counts.dashboard_count(qs, filters)
+        )
+    page, sections, options = await asyncio.gather(
+        listing,
+        run_query(role_sections, request.user),
+        run_query(filter_options),
+    )
+
+    total_is_estimate = False
+    if params['cursor_mode']:
+        page_obj, paginator, total_rows = page, None, None
+    else:
+        page_obj, paginator, total_is_estimate = page
+        total_rows = paginator.count
+    context = await run_query(
+        dashboard_context, request, params, page_obj, paginator, total_rows, total_is_estimate, sections, options
+    )
+    return await sync_to_async(render)(request, 'transfer_app/dashboard.html', context)
+
+
+async def full_list(request, mode):
+    authenticated, profile = await sync_to_async(auth_profile)(request)
+    if not authenticated:
+        return redirect_to_login(request.get_full_path())
+    role, _, key, _, denied = FULL_LISTS[mode]
+    if not profile or profile.role != role:
+        await sync_to_async(messages.error)(request, denied)
+        return redirect('transfer_app:dashboard')
+    qs = full_list_rows(request.user, mode)
+    if use_cursor_paging(request):
+        page_obj = await run_query(KeysetPaginator(qs, key, FULL_LIST_PAGE_SIZE).get_page, request.GET.get('cursor'))
+    else:
+        page = request.GET.get('page', '1')
+        page_num = int(page) if page.isdigit() else 1
+        page_obj, _, _ = await fetch_page(qs, page_num, FULL_LIST_PAGE_SIZE, lambda: exact_count(qs))
+    return await sync_to_async(render)(
+        request, 'transfer_app/list_full.html', full_list_context(request, mode, page_obj)
+    )
+
+
+@read_replica
+async def my_requests_full(request):
+    return await full_list(request, 'created')
+
+
+@read_replica
+async def approved_by_me_full(request):
+    return await full_list(request, 'approved')
+
+
+@read_replica
+async def confirmed_by_me_full(request):
+    return await full_list(request, 'confirmed')
+
+
+async def notifications(request):
+    authenticated, profile = await sync_to_async(auth_profile)(request)
+    if not authenticated:
+        return HttpResponse(status=204)
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+    response = StreamingHttpResponse(
+        push.stream(request.user.id, profile.role if profile else None, last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
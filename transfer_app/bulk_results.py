@@ -0,0 +1,42 @@
+"""Short-lived storage of bulk action results for the result page.
+
+bulk_action saves its workflow.BulkResult as a BulkActionResult row under a
+random id and redirects with a single message linking to it, instead of one
+session message per request. The row lives in the database, so every worker
+process finds it. Only the user who ran the action can load it back; after
+TRANSFER_BULK_RESULT_TTL seconds it is gone, and expired rows are deleted
+whenever a new result is saved.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import BulkActionResult
+from .workflow import BulkResult
+
+RESULT_TTL = getattr(settings, 'TRANSFER_BULK_RESULT_TTL', 3600)
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=RESULT_TTL)
+
+
+def save(user_id, result):
+    """Store `result` for `user_id`; returns its id."""
+    BulkActionResult.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    row = BulkActionResult.objects.create(
+        result_id=uuid.uuid4().hex, user_id=user_id, action=result.action, groups=result.groups
+    )
+    return row.result_id
+
+
+def load(user_id, result_id):
+    """The BulkResult stored under `result_id` for this user, or None if expired or not theirs."""
+    row = BulkActionResult.objects.filter(
+        result_id=result_id, user_id=user_id, created_at__gte=expiry_cutoff()
+    ).values('action', 'groups').first()
+    if row is None:
+        return None
+    return BulkResult.from_dict(row)
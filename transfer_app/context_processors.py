@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def push(request):
+    """`push_enabled`: the SSE notification stream is only served by the ASGI views."""
+    return {'push_enabled': getattr(settings, 'TRANSFER_ASYNC_VIEWS', False)}
@@ -0,0 +1,135 @@
+"""Materialized status counters per batch, designated lead and requester.
+
+Every workflow write adjusts the StatusCounter rows it affects by a delta in
+the same transaction (one UPDATE per (scope, owner, status) touched, however
+many requests moved), so "how many requests wait on lead X" or "how far along
+is batch PH00123" is a key lookup instead of a GROUP BY over TransferRequest.
+Edits outside the workflow (admin) recompute the owners they touch with
+refresh(); the rebuild_status_counters command recomputes everything.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F
+
+from .models import StatusCounter, TransferRequest
+
+# scope: the request row key (as in workflow.lock_rows) that names its owner
+SCOPE_FIELDS = {
+    StatusCounter.SCOPE_BATCH: 'batch_id',
+    StatusCounter.SCOPE_LEAD: 'batch__designated_lead_id',
+    StatusCounter.SCOPE_REQUESTER: 'requested_by_id',
+}
+
+
+def request_row(tr, lead_id=None):
+    """The counter-relevant fields of a TransferRequest instance, as a lock_rows-style dict."""
+    return {
+        'batch_id': tr.batch_id,
+        'batch__designated_lead_id': lead_id,
+        'requested_by_id': tr.requested_by_id,
+        'status': tr.status,
+    }
+
+
+def owners(row):
+    for scope, field in SCOPE_FIELDS.items():
+        if row.get(field):
+            yield scope, row[field]
+
+
+def apply_deltas(deltas):
+    """Add {(scope, owner_id, status): delta} to the counters."""
+    # Fixed order, so concurrent writers lock counter rows in the same sequence
+    for (scope, owner_id, status), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        qs = StatusCounter.objects.filter(scope=scope, owner_id=owner_id, status=status)
+        if not qs.update(count=F('count') + delta):
+            StatusCounter.objects.bulk_create(
+                [StatusCounter(scope=scope, owner_id=owner_id, status=status)], ignore_conflicts=True
+            )
+            qs.update(count=F('count') + delta)
+
+
+def record_transition(rows, new_status):
+    """`rows` (with their old status) moved to `new_status`."""
+    deltas = defaultdict(int)
+    for row in rows:
+        for scope, owner_id in owners(row):
+            deltas[scope, owner_id, row['status']] -= 1
+            deltas[scope, owner_id, new_status] += 1
+    apply_deltas(deltas)
+
+
+def record_added(rows, sign=1):
+    deltas = defaultdict(int)
+    for row in rows:
+        for scope, owner_id in owners(row):
+            deltas[scope, owner_id, row['status']] += sign
+    apply_deltas(deltas)
+
+
+def record_removed(rows):
+    record_added(rows, sign=-1)
+
+
+def record_added_counts(counted):
+    """[(row, n)]: n requests with the counter fields of `row` were added."""
+    deltas = defaultdict(int)
+    for row, n in counted:
+        for scope, owner_id in owners(row):
+            deltas[scope, owner_id, row['status']] += n
+    apply_deltas(deltas)
+
+
+def computed(scope, owner_ids=None):
+    """(owner_id, status, count) rows aggregated from TransferRequest."""
+    field = SCOPE_FIELDS[scope]
+    qs = TransferRequest.objects.filter(**{f'{field}__isnull': False})
+    if owner_ids is not None:
+        qs = qs.filter(**{f'{field}__in': owner_ids})
+    return qs.order_by().values_list(field, 'status').annotate(n=Count('id'))
+
+
+def refresh(scope, owner_ids):
+    """Recompute the counters of the given owners from TransferRequest."""
+    owner_ids = sorted({oid for oid in owner_ids if oid})
+    if not owner_ids:
+        return
+    StatusCounter.objects.filter(scope=scope, owner_id__in=owner_ids).delete()
+    StatusCounter.objects.bulk_create([
+        StatusCounter(scope=scope, owner_id=owner_id, status=status, count=n)
+        for owner_id, status, n in computed(scope, owner_ids)
+    ])
+
+
+def rebuild():
+    """Recompute every counter; returns the number of counter rows written."""
+    StatusCounter.objects.all().delete()
+    written = 0
+    for scope in SCOPE_FIELDS:
+        counters = [
+            StatusCounter(scope=scope, owner_id=owner_id, status=status, count=n)
+            for owner_id, status, n in computed(scope).iterator()
+        ]
+        StatusCounter.objects.bulk_create(counters, batch_size=1000)
+        written += len(counters)
+    return written
+
+
+def counts_for(scope, owner_ids):
+    """{owner_id: {'PENDING': n, ..., 'total': n}} read from the counters."""
+    result = {oid: {'total': 0} for oid in owner_ids}
+    rows = StatusCounter.objects.filter(scope=scope, owner_id__in=owner_ids, count__gt=0).values_list(
+        'owner_id', 'status', 'count'
+    )
+    for owner_id, status, n in rows:
+        result[owner_id][status] = n
+        result[owner_id]['total'] += n
+    return result
+
+
+def count(scope, owner_id, status):
+    return StatusCounter.objects.filter(scope=scope, owner_id=owner_id, status=status).values_list(
+        'count', flat=True
+    ).first() or 0
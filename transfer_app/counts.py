@@ -0,0 +1,75 @@
+"""Cached and estimated row counts for the filtered dashboard listing.
+
+Exact counts are cached per normalized filter fingerprint for a short TTL.
+Every key embeds a generation number that is bumped whenever a request is
+written, so a status change invalidates all cached counts at once. When no
+filter is applied the count is read from table statistics instead; such
+an estimate is only shown, never paginated on (see EstimatedPaginator).
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import TransferRequest
+
+COUNT_CACHE_TTL = getattr(settings, 'TRANSFER_COUNT_CACHE_TTL', 30)
+ESTIMATE_THRESHOLD = getattr(settings, 'TRANSFER_COUNT_ESTIMATE_THRESHOLD', 10000)
+GENERATION_KEY = 'transfer_app:count_gen'
+
+
+def filter_fingerprint(filters):
+    normalized = sorted((k, str(v).strip()) for k, v in filters.items() if v)
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()
+
+
+def generation():
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        cache.add(GENERATION_KEY, 1, None)
+        gen = cache.get(GENERATION_KEY, 1)
+    return gen
+
+
+def invalidate():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, None)
+
+
+def estimated_table_rows(model=TransferRequest, using=DEFAULT_DB_ALIAS):
+    """Row estimate from the statistics of database `using`, or None if unavailable."""
+    table = model._meta.db_table
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', [table]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def dashboard_count(qs, filters):
+    """Return (count, is_estimate) for the dashboard queryset `qs`."""
+    if not any(filters.values()):
+        # Ask the database the listing itself reads from (a replica under @read_replica)
+        estimate = estimated_table_rows(qs.model, qs.db)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate, True
+    key = f'transfer_app:count:{generation()}:{filter_fingerprint(filters)}'
+    count = cache.get(key)
+    if count is None:
+        count = qs.count()
+        cache.set(key, count, COUNT_CACHE_TTL)
+    return count, False
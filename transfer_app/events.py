@@ -0,0 +1,92 @@
+"""Append-only TransferEvent log and the since-cursor change feed read from it.
+
+Every path that changes a request appends events in the same transaction:
+workflow transitions (single views and bulk_action) through
+workflow.after_transition(), new batches through workflow.publish_batch(), and
+ORM/admin creates, edits and deletes through signals and the admin. The
+event id is the feed cursor: a consumer stores the last id it processed and
+asks for the events after it, so syncing costs O(changes) instead of
+rescanning TransferRequest.
+
+Ids are handed out at insert time but become visible at commit, so a
+transaction can commit an id lower than one already read. feed() therefore
+only returns events older than TRANSFER_EVENT_SETTLE_SECONDS; events are
+written at the end of their (short) transactions, which keeps that window small.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import push
+from .models import TransferEvent, TransferRequest
+
+SETTLE_SECONDS = getattr(settings, 'TRANSFER_EVENT_SETTLE_SECONDS', 5)
+FEED_FIELDS = ('id', 'kind', 'request_id', 'batch_id', 'from_status', 'to_status',
+               'actor__username', 'reason', 'created_at')
+
+
+def appended():
+    # Let this process's SSE streams see the new events as soon as they commit
+    transaction.on_commit(push.publish)
+
+
+def record_transition(rows, new_status, actor_id, reason=''):
+    """`rows` (lock_rows dicts with their old status) moved to `new_status`."""
+    appended()
+    TransferEvent.objects.bulk_create([
+        TransferEvent(
+            kind=TransferEvent.KIND_TRANSITION, request_id=row['id'], batch_id=row['batch_id'],
+            from_status=row['status'], to_status=new_status, actor_id=actor_id, reason=reason or '',
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+def record_created(batch_id, rows):
+    """(request id, status, requester id) rows just inserted into `batch_id`."""
+    appended()
+    TransferEvent.objects.bulk_create([
+        TransferEvent(
+            kind=TransferEvent.KIND_CREATED, request_id=rid, batch_id=batch_id,
+            to_status=status, actor_id=requester_id,
+        )
+        for rid, status, requester_id in rows
+    ], batch_size=1000)
+
+
+def record_batch_created(batch_id):
+    """A CREATED event for every request of `batch_id`, with one INSERT ... SELECT."""
+    appended()
+    table = connection.ops.quote_name(TransferEvent._meta.db_table)
+    requests = connection.ops.quote_name(TransferRequest._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (kind, request_id, batch_id, from_status, to_status, actor_id, reason, created_at) '
+            f'SELECT %s, id, batch_id, %s, status, requested_by_id, %s, %s FROM {requests} '
+            f'WHERE batch_id = %s ORDER BY id',
+            [TransferEvent.KIND_CREATED, '', '', connection.ops.adapt_datetimefield_value(timezone.now()), batch_id],
+        )
+
+
+def record(kind, request_id, batch_id, from_status='', to_status='', actor_id=None):
+    appended()
+    TransferEvent.objects.create(
+        kind=kind, request_id=request_id, batch_id=batch_id,
+        from_status=from_status, to_status=to_status, actor_id=actor_id,
+    )
+
+
+def feed(since, limit):
+    """Up to `limit` settled events after cursor `since`, as (rows, next cursor, more)."""
+    settled = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+    rows = list(
+        TransferEvent.objects.filter(id__gt=since, created_at__lte=settled)
+        .order_by('id').values_list(*FEED_FIELDS)[:limit + 1]
+    )
+    more = len(rows) > limit
+    rows = [dict(zip(FEED_FIELDS, row)) for row in rows[:limit]]
+    for row in rows:
+        row['actor'] = row.pop('actor__username')
+    return rows, rows[-1]['id'] if rows else since, more
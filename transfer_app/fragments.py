@@ -0,0 +1,62 @@
+"""Cache keys for the dashboard's per-batch blocks.
+
+Each batch block is rendered inside {% cache %} under a key built from the
+batch's version counter, the viewer's role, the batch fields the block shows,
+the rows shown (with their updated_at) and the relative time labels on them.
+Any write to a request of the batch (single views, bulk actions, imports,
+admin) bumps the batch's version, so a block is only rendered again after its
+batch changed or its "x phút trước" text moved on.
+
+The key alone already changes with every edit it can show, so a process that
+missed a bump (a per-process cache, see CACHES in settings) never serves a
+stale block; the shared cache is what lets the workers reuse each other's.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+FRAGMENT_CACHE_TTL = getattr(settings, 'TRANSFER_FRAGMENT_CACHE_TTL', 24 * 60 * 60)
+
+
+def batch_version_key(batch_id):
+    return f'transfer_app:batch_v:{batch_id}'
+
+
+def bump_batch_versions(batch_ids):
+    for batch_id in set(batch_ids):
+        if batch_id is None:
+            continue
+        key = batch_version_key(batch_id)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def batch_versions(batch_ids):
+    """{batch_id: version} with a single cache round trip."""
+    found = cache.get_many([batch_version_key(bid) for bid in batch_ids])
+    return {bid: found.get(batch_version_key(bid), 0) for bid in batch_ids}
+
+
+def block_key(data, version, role, extra=''):
+    batch = data['batch']
+    parts = [batch.id, version, role or '', extra, data['age'], data['is_old'], batch.description, batch.designated_lead_id]
+    parts.extend((r.id, r.updated_at, r.age) for r in data['requests'])
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def annotate_blocks(batches, role, batch_mode, status_query=''):
+    """Set 'cache_key' on every block dict built by views.group_page (after rendering.decorate_batches)."""
+    versions = batch_versions([data['batch'].id for data in batches])
+    for data in batches:
+        batch = data['batch']
+        if batch_mode:
+            # Header shows the batch-wide status counts and a per-status link
+            extra = f"batch:{status_query}:{sorted(data['counts'].items())}"
+        else:
+            extra = 'rows'
+        data['cache_key'] = block_key(data, versions[batch.id], role, extra)
+    return batches
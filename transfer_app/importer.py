@@ -0,0 +1,145 @@
+"""Streaming import of transfer requests from CSV (or XLSX, if openpyxl is installed).
+
+Rows are read one at a time, validated and inserted in chunks of plain
+executemany() INSERTs, so memory stays flat regardless of the file size.
+Invalid rows are handed to an `on_error` callback instead of being collected,
+and the caller decides how much of the report to keep.
+
+An import is all or nothing: the batch and all of its chunks are written in
+one transaction, and its counters and change-feed events only after the last
+chunk. Nobody sees the batch (no lead inbox, no push notification) until it
+commits, and a read error halfway through the file rolls everything back.
+"""
+import csv
+import io
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+
+from . import workflow
+
+COLUMNS = ('msnv', 'from_code', 'to_code', 'effective_date', 'is_permanent')
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'có', 'co', 'vĩnh viễn'}
+CHUNK_SIZE = 1000
+
+RowError = namedtuple('RowError', 'line msnv error')
+ImportResult = namedtuple('ImportResult', 'batch imported errors')
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+# What reading a malformed file can raise; callers report these to the user
+READ_ERRORS = (ImportFormatError, UnicodeDecodeError, csv.Error)
+
+
+def iter_csv(fileobj):
+    reader = csv.reader(fileobj)
+    header = [h.strip().lower() for h in next(reader, [])]
+    missing = [c for c in COLUMNS if c not in header]
+    if missing:
+        raise ImportFormatError(f'Thiếu cột: {", ".join(missing)}')
+    for line, values in enumerate(reader, start=2):
+        if any(v.strip() for v in values):
+            yield line, dict(zip(header, values))
+
+
+def iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError('Cần cài openpyxl để nhập tệp .xlsx')
+    sheet = load_workbook(fileobj, read_only=True, data_only=True).active
+    rows = sheet.iter_rows(values_only=True)
+    header = [str(h or '').strip().lower() for h in next(rows, ())]
+    missing = [c for c in COLUMNS if c not in header]
+    if missing:
+        raise ImportFormatError(f'Thiếu cột: {", ".join(missing)}')
+    for line, values in enumerate(rows, start=2):
+        if any(v not in (None, '') for v in values):
+            yield line, dict(zip(header, values))
+
+
+def iter_rows(fileobj, filename):
+    """Yield (line number, raw row dict) from a binary file object."""
+    if filename.lower().endswith('.xlsx'):
+        return iter_xlsx(fileobj)
+    return iter_csv(io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline=''))
+
+
+def parse_date(value):
+    if hasattr(value, 'date') and callable(value.date):
+        return value.date()
+    if hasattr(value, 'year'):
+        return value
+    text = str(value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def build_request(raw, requested_by):
+    """Return (row for workflow.insert_rows(), None) or (None, error message) for one raw row."""
+    msnv = str(raw.get('msnv') or '').strip()
+    from_code = str(raw.get('from_code') or '').strip()
+    to_code = str(raw.get('to_code') or '').strip()
+    effective_date = parse_date(raw.get('effective_date'))
+    is_permanent = str(raw.get('is_permanent') or '').strip().lower() in TRUE_VALUES
+    if not msnv:
+        return None, 'Thiếu MSNV'
+    if len(msnv) > 50:
+        return None, 'MSNV quá dài'
+    if not (len(from_code) == 5 and from_code.isdigit() and len(to_code) == 5 and to_code.isdigit()):
+        return None, 'Mã nhóm phải gồm đúng 5 chữ số'
+    if from_code == to_code:
+        return None, 'Mã nhóm hiện tại và chuyển đến phải khác nhau'
+    if effective_date is None:
+        return None, 'Ngày hiệu lực không hợp lệ'
+    return {
+        'msnv': msnv,
+        'from_code': from_code,
+        'to_code': to_code,
+        'effective_date': effective_date,
+        'is_permanent': is_permanent,
+        'requested_by_id': requested_by.pk,
+    }, None
+
+
+def import_rows(rows, requested_by, designated_lead, description, on_error=None, chunk_size=CHUNK_SIZE):
+    """Import (line, raw) rows into one new batch; returns ImportResult.
+
+    Errors raised while reading `rows` propagate with nothing imported. No
+    batch is created if no row turned out to be valid.
+    """
+    rows = iter(rows)
+    # Reading the first chunk checks the header before the transaction starts
+    chunk = list(islice(rows, chunk_size))
+    imported = errors = 0
+    with transaction.atomic():
+        batch = workflow.create_batch(requested_by, designated_lead, description)
+        while chunk:
+            valid = []
+            for line, raw in chunk:
+                row, error = build_request(raw, requested_by)
+                if error:
+                    errors += 1
+                    if on_error:
+                        on_error(RowError(line, str(raw.get('msnv') or '').strip(), error))
+                else:
+                    valid.append(row)
+            if valid:
+                imported += workflow.insert_rows(batch, valid)
+            chunk = list(islice(rows, chunk_size))
+        if imported:
+            workflow.publish_batch(batch)
+        else:
+            transaction.set_rollback(True)
+            batch = None
+    return ImportResult(batch, imported, errors)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from transfer_app import archive
+
+
+class Command(BaseCommand):
+    help = 'Move finished batches and requests older than the cutoff into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=archive.ARCHIVE_AFTER_DAYS,
+                            help='Archive what finished at least this many days ago')
+        parser.add_argument('--batch-chunk', type=int, default=archive.BATCH_CHUNK_SIZE,
+                            help='Batches moved per transaction')
+        parser.add_argument('--request-chunk', type=int, default=archive.REQUEST_CHUNK_SIZE,
+                            help='Batchless requests moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would move')
+
+    def handle(self, *args, **options):
+        cutoff = archive.cutoff_for(options['days'])
+        if options['dry_run']:
+            batches = archive.finished_batches(cutoff).count()
+            loose = archive.loose_requests(cutoff).count()
+            self.stdout.write(f'{batches} batches and {loose} batchless requests finished before {cutoff:%Y-%m-%d}')
+            return
+        started = time.perf_counter()
+
+        def progress(batches, requests):
+            self.stdout.write(f'  {batches} batches, {requests} requests')
+
+        batches, requests = archive.archive_finished(
+            options['days'], options['batch_chunk'], options['request_chunk'], progress
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {batches} batches and {requests} requests in {elapsed:.1f}s'
+        ))
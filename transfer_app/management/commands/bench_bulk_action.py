@@ -0,0 +1,92 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models.signals import post_save, pre_save
+from django.db import connection, transaction
+from django.utils import timezone
+
+from transfer_app import signals, workflow
+from transfer_app.models import Batch, TransferRequest
+
+# TransferRequest save receivers added after the per-row loop was replaced:
+# the loop ran without them, so the baseline run disconnects them
+LATER_SAVE_RECEIVERS = [
+    (pre_save, signals.set_request_assignee),
+    (post_save, signals.index_request_msnv),
+    (post_save, signals.record_workflow_actors),
+    (post_save, signals.invalidate_dashboard_counts),
+    (post_save, signals.bump_request_batch_version),
+    (post_save, signals.count_created_request),
+    (post_save, signals.log_created_request),
+]
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries (CaptureQueriesContext keeps only the last 9000)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row and set-based bulk approval on throwaway data (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        for label, runner in [('per-row', self.per_row), ('set-based', self.set_based)]:
+            with transaction.atomic():
+                lead, ids = self.make_data(rows)
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    started = time.perf_counter()
+                    runner(lead, ids)
+                    elapsed = time.perf_counter() - started
+                approved = TransferRequest.objects.filter(id__in=ids, status='APPROVED').count()
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f'{label:10s} rows={rows} approved={approved} queries={counter.count} '
+                f'time={elapsed * 1000:.1f}ms'
+            )
+
+    def make_data(self, rows):
+        tag = uuid.uuid4().hex[:8]
+        lead = User.objects.create(username=f'bench-lead-{tag}')
+        batch = Batch.objects.create(batch_number=f'BENCH-{tag}', created_by=lead, designated_lead=lead)
+        TransferRequest.objects.bulk_create([
+            TransferRequest(batch=batch, msnv=f'B{i:06d}', effective_date=timezone.localdate(), requested_by=lead)
+            for i in range(rows)
+        ])
+        return lead, list(batch.requests.values_list('id', flat=True))
+
+    def per_row(self, lead, ids):
+        for signal, receiver in LATER_SAVE_RECEIVERS:
+            signal.disconnect(receiver, sender=TransferRequest)
+        try:
+            self.per_row_loop(lead, ids)
+        finally:
+            for signal, receiver in LATER_SAVE_RECEIVERS:
+                signal.connect(receiver, sender=TransferRequest)
+
+    def per_row_loop(self, lead, ids):
+        # The pre-engine bulk_action loop
+        for rid in ids:
+            tr = TransferRequest.objects.select_for_update().get(id=rid)
+            if tr.batch and tr.batch.designated_lead and tr.batch.designated_lead != lead:
+                continue
+            if tr.status == 'PENDING':
+                tr.approved_by = lead
+                tr.approved_at = timezone.now()
+                tr.status = 'APPROVED'
+                tr.save()
+
+    def set_based(self, lead, ids):
+        workflow.bulk_transition(lead, 'LEAD', 'approve', ids)
@@ -0,0 +1,91 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from transfer_app import views
+from transfer_app.models import Batch, TransferRequest, UserProfile
+
+STATUSES = ['PENDING', 'APPROVED', 'CONFIRMED', 'REJECTED', 'CANCELED']
+
+
+class Command(BaseCommand):
+    help = 'Time rendering of a dashboard page on throwaway data (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--per-batch', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            user = self.make_data(rows, options['per_batch'])
+            request = RequestFactory().get('/dashboard/', {'page_size': 100})
+            request.user = user
+            started = time.perf_counter()
+            context = self.build_context(request, rows)
+            build_ms = (time.perf_counter() - started) * 1000
+            # First render compiles and caches the templates
+            render_to_string('transfer_app/dashboard.html', context, request=request)
+            keys = {id(data): data['cache_key'] for data in context['batches']}
+
+            def cold():
+                # Fresh keys: every batch block misses the fragment cache
+                for data in context['batches']:
+                    data['cache_key'] = uuid.uuid4().hex
+                return self.render(context, request)
+
+            def warm():
+                for data in context['batches']:
+                    data['cache_key'] = keys[id(data)]
+                return self.render(context, request)
+
+            results = [(label, [fn() for _ in range(repeat)]) for label, fn in [('cold', cold), ('warm', warm)]]
+            transaction.set_rollback(True)
+        self.stdout.write(f'rows={rows} batches={len(context["batches"])} context={build_ms:.1f}ms')
+        for label, times in results:
+            self.stdout.write(
+                f'{label:5s} render median={statistics.median(times):.2f}ms '
+                f'min={min(times):.2f}ms max={max(times):.2f}ms n={len(times)}'
+            )
+
+    def render(self, context, request):
+        started = time.perf_counter()
+        render_to_string('transfer_app/dashboard.html', context, request=request)
+        return (time.perf_counter() - started) * 1000
+
+    def make_data(self, rows, per_batch):
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f'bench-render-{tag}')
+        UserProfile.objects.create(user=user, role='LEAD', msnv=f'BR{tag}')
+        requests = []
+        for start in range(0, rows, per_batch):
+            batch = Batch.objects.create(
+                batch_number=f'BENCH-{tag}-{start}', description='Benchmark', created_by=user, designated_lead=user
+            )
+            requests.extend(
+                TransferRequest(
+                    batch=batch, msnv=f'R{i:06d}', from_code='11111', to_code='22222',
+                    effective_date=timezone.localdate(), status=STATUSES[i % len(STATUSES)], requested_by=user,
+                )
+                for i in range(start, min(start + per_batch, rows))
+            )
+        TransferRequest.objects.bulk_create(requests)
+        return user
+
+    def build_context(self, request, rows):
+        params = views.read_dashboard_params(request)
+        qs = views.dashboard_queryset(params['filters']).filter(requested_by=request.user)
+        paginator = views.CountedPaginator(qs, rows, rows)
+        page_obj = paginator.get_page(1)
+        return views.dashboard_context(
+            request, params, page_obj, paginator, rows, False,
+            views.role_sections(request.user), views.filter_options(),
+        )
@@ -0,0 +1,236 @@
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from transfer_app import perf, views
+from transfer_app.models import Batch, StatusCounter, TransferRequest, UserProfile
+
+
+class Command(BaseCommand):
+    help = ('Time the main views (latency, queries, DB time) through the full middleware stack '
+            'against the current database and write the results as JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario, after one warm-up run')
+        parser.add_argument('--max-filters', type=int, default=len(views.DASHBOARD_FILTERS),
+                            help='Largest number of dashboard filters combined in one scenario')
+        parser.add_argument('--only', default='', help='Run only scenarios whose name starts with this')
+        parser.add_argument('--output', default='', help='JSON file (default bench_results/bench-<timestamp>.json)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.repeat = max(options['repeat'], 1)
+        self.client = Client(HTTP_HOST=bench_host())
+        actors = self.pick_actors()
+        # Every request is recorded here; the sampling middleware stays out of the way
+        perf.SAMPLE_RATE = 0
+        results = []
+        for name, params, run in self.scenarios(actors, options['max_filters']):
+            if options['only'] and not name.startswith(options['only']):
+                continue
+            result = self.measure(name, params, run)
+            results.append(result)
+            self.stdout.write(
+                f'{name:40s} median={result["median_ms"]:8.1f}ms p95={result["p95_ms"]:8.1f}ms '
+                f'queries={result["queries"]:4d} db={result["db_ms"]:7.1f}ms'
+            )
+        path = options['output'] or os.path.join(
+            'bench_results', f'bench-{timezone.now():%Y%m%d-%H%M%S}.json'
+        )
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': self.meta(actors), 'results': results}, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} scenarios written to {path}'))
+
+    def pick_actors(self):
+        """The busiest user of each role, so the lists and filters have real work to do."""
+        actors = {}
+        for role, scope in [('SUPERVISOR', StatusCounter.SCOPE_REQUESTER), ('LEAD', StatusCounter.SCOPE_LEAD),
+                            ('DATA_PROCESSOR', None)]:
+            users = UserProfile.objects.filter(role=role).values_list('user_id', flat=True)
+            if scope:
+                top = (
+                    StatusCounter.objects.filter(scope=scope, owner_id__in=users)
+                    .values('owner_id').annotate(n=Max('count')).order_by('-n').first()
+                )
+                user_id = top['owner_id'] if top else None
+            else:
+                top = (
+                    TransferRequest.objects.filter(confirmed_by__in=users)
+                    .values('confirmed_by').annotate(n=Count('id')).order_by('-n').first()
+                )
+                user_id = top['confirmed_by'] if top else None
+            user_id = user_id or users.first()
+            if user_id is None:
+                raise CommandError(f'No {role} user: run generate_data first')
+            actors[role] = User.objects.get(id=user_id)
+        return actors
+
+    def scenarios(self, actors, max_filters):
+        """(name, params, run) for every measured case; run() returns the response."""
+        supervisor, lead, processor = actors['SUPERVISOR'], actors['LEAD'], actors['DATA_PROCESSOR']
+        dashboard = reverse('transfer_app:dashboard')
+        values = self.filter_values(actors)
+        for size in range(0, max_filters + 1):
+            for names in itertools.combinations(views.DASHBOARD_FILTERS, size):
+                params = {name: values[name] for name in names}
+                yield f'dashboard[{",".join(names) or "-"}]', params, self.get(supervisor, dashboard, params)
+        yield 'dashboard.batch', {'view': 'batch'}, self.get(supervisor, dashboard, {'view': 'batch'})
+        yield 'dashboard.cursor', {'paging': 'cursor'}, self.get(supervisor, dashboard, {'paging': 'cursor'})
+        yield 'dashboard.page_size', {'page_size': 100}, self.get(supervisor, dashboard, {'page_size': 100})
+
+        for mode, url_name, user in [('created', 'my_requests_full', supervisor), ('approved', 'approved_by_me_full', lead),
+                                     ('confirmed', 'confirmed_by_me_full', processor)]:
+            url = reverse(f'transfer_app:{url_name}')
+            total = views.full_list_queryset(user, mode).count()
+            deep = max(total // views.FULL_LIST_PAGE_SIZE // 2, 1)
+            yield f'{url_name}.page1', {}, self.get(user, url, {})
+            yield f'{url_name}.deep', {'page': deep}, self.get(user, url, {'page': deep})
+            yield f'{url_name}.cursor', {'paging': 'cursor'}, self.get(user, url, {'paging': 'cursor'})
+
+        request_ids = self.sample_request_ids(self.repeat + 1)
+        yield 'view_request', {'ids': len(request_ids)}, self.get_each(
+            supervisor, [reverse('transfer_app:view_request', args=[rid]) for rid in request_ids]
+        )
+
+        form = {
+            'msnv': ' '.join(f'BENCH{i:05d}' for i in range(20)), 'from_code': '10001', 'to_code': '10002',
+            'effective_date': timezone.localdate().isoformat(), 'batch_description': 'Benchmark',
+            'designated_lead': lead.id,
+        }
+        yield 'create_request', {'msnv': 20}, self.post(supervisor, reverse('transfer_app:create_request'), form)
+
+        pending = list(
+            TransferRequest.objects.filter(batch__designated_lead=lead, status='PENDING')
+            .order_by('-created_at').values_list('id', flat=True)[:100]
+        )
+        yield 'bulk_action.approve', {'ids': len(pending)}, self.post(
+            lead, reverse('transfer_app:bulk_action'), {'action': 'approve', 'ids': pending}
+        )
+
+    def filter_values(self, actors):
+        """A realistic value per dashboard filter, taken from the data."""
+        today = timezone.localdate()
+        msnv = TransferRequest.objects.order_by('-id').values_list('msnv', flat=True).first() or 'NV'
+        desc = Batch.objects.order_by('-id').values_list('description', flat=True).first() or ''
+        return {
+            'desc': desc.split()[0] if desc else 'phiếu',
+            'status': 'PENDING',
+            'created_from': (today - timedelta(days=30)).isoformat(),
+            'created_to': today.isoformat(),
+            'approved_by': actors['LEAD'].username,
+            'confirmed_by': actors['DATA_PROCESSOR'].username,
+            'requested_by': actors['SUPERVISOR'].username,
+            'msnv': msnv,
+        }
+
+    def sample_request_ids(self, n):
+        top = TransferRequest.objects.aggregate(m=Max('id'))['m'] or 0
+        ids = []
+        for _ in range(n * 5):
+            found = TransferRequest.objects.filter(id__gte=self.rng.randint(1, max(top, 1))).order_by('id')
+            found = found.values_list('id', flat=True).first()
+            if found:
+                ids.append(found)
+            if len(ids) == n:
+                break
+        return ids or [0]
+
+    def login(self, user):
+        self.client.force_login(user)
+
+    def get(self, user, url, params):
+        def run(i):
+            self.login(user)
+            return self.client.get(url, params)
+        return run
+
+    def get_each(self, user, urls):
+        def run(i):
+            self.login(user)
+            return self.client.get(urls[i % len(urls)])
+        return run
+
+    def post(self, user, url, data):
+        # Writes are rolled back, so every run sees the same data
+        def run(i):
+            self.login(user)
+            with transaction.atomic():
+                response = self.client.post(url, data)
+                transaction.set_rollback(True)
+            return response
+        return run
+
+    def measure(self, name, params, run):
+        run(0)  # warm-up: template compilation, connection setup, caches
+        times, queries, db_ms = [], [], []
+        status = None
+        for i in range(1, self.repeat + 1):
+            token = perf.start()
+            started = time.perf_counter()
+            try:
+                response = run(i)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                recorder = perf.stop(token)
+            status = response.status_code
+            times.append(elapsed)
+            queries.append(recorder.queries)
+            db_ms.append(recorder.db_seconds * 1000)
+        ordered = sorted(times)
+        return {
+            'name': name,
+            'params': params,
+            'status': status,
+            'n': len(times),
+            'median_ms': round(statistics.median(times), 2),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            'min_ms': round(ordered[0], 2),
+            'max_ms': round(ordered[-1], 2),
+            'queries': max(queries),
+            'db_ms': round(statistics.median(db_ms), 2),
+        }
+
+    def meta(self, actors):
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'async_views': bool(getattr(settings, 'TRANSFER_ASYNC_VIEWS', False)),
+            'repeat': self.repeat,
+            'users': {role: user.username for role, user in actors.items()},
+            'rows': {
+                'batches': Batch.objects.count(),
+                'requests': TransferRequest.objects.count(),
+                'pending': TransferRequest.objects.filter(status='PENDING').count(),
+            },
+        }
+
+
+def bench_host():
+    hosts = [h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,168 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from transfer_app import counters, counts, search, workflow
+from transfer_app.models import Batch, SearchTerm, TransferRequest, UserProfile
+
+REASONS = [
+    'Chuyển đổi ca làm việc', 'Điều chuyển sang chuyền mới', 'Tăng cường nhân lực cho đơn hàng gấp',
+    'Cân đối nhân sự giữa các nhóm', 'Đào tạo chéo kỹ năng', 'Nhân viên xin chuyển nhóm',
+    'Sắp xếp lại tổ sản xuất', 'Hỗ trợ bộ phận kiểm hàng',
+]
+# (days-old threshold, status weights): old work is nearly all finished
+STATUS_MIX = [
+    (30, {'CONFIRMED': 80, 'REJECTED': 10, 'CANCELED': 6, 'APPROVED': 2, 'PENDING': 2}),
+    (0, {'PENDING': 35, 'APPROVED': 25, 'CONFIRMED': 30, 'REJECTED': 6, 'CANCELED': 4}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate realistic users, batches and transfer requests for local performance work'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--supervisors', type=int, default=20)
+        parser.add_argument('--leads', type=int, default=50)
+        parser.add_argument('--processors', type=int, default=10)
+        parser.add_argument('--batches', type=int, default=1000)
+        parser.add_argument('--per-batch', type=int, default=10, help='Average requests per batch')
+        parser.add_argument('--days', type=int, default=365, help='Spread creation times over this many days')
+        parser.add_argument('--employees', type=int, default=50000, help='Size of the MSNV pool')
+        parser.add_argument('--chunk', type=int, default=1000, help='Batches per transaction')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='gen', help='Username prefix of the generated users')
+        parser.add_argument('--password', default='pass123')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        users = self.make_users(options)
+        started = time.perf_counter()
+        next_batch = (Batch.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+        next_request = (TransferRequest.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+        made_batches = made_requests = 0
+        while made_batches < options['batches']:
+            size = min(options['chunk'], options['batches'] - made_batches)
+            with transaction.atomic():
+                batch_rows, request_rows = self.make_chunk(next_batch, next_request, size, users, options)
+                insert_rows(Batch, batch_rows)
+                insert_rows(TransferRequest, request_rows)
+                search.index_objects(
+                    SearchTerm.KIND_BATCH_DESC, [(b['id'], b['description']) for b in batch_rows], replace=False
+                )
+                search.index_objects(
+                    SearchTerm.KIND_MSNV, [(r['id'], r['msnv']) for r in request_rows], replace=False
+                )
+            next_batch += size
+            next_request += len(request_rows)
+            made_batches += size
+            made_requests += len(request_rows)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'  {made_batches} batches, {made_requests} requests ({made_requests / elapsed:.0f} requests/s)'
+            )
+        self.stdout.write('Rebuilding status counters and the approver directory...')
+        counters.rebuild()
+        call_command('rebuild_workflow_actors', stdout=self.stdout)
+        counts.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {made_batches} batches and {made_requests} requests in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def make_users(self, options):
+        password = make_password(options['password'])
+        users = {}
+        for role, key in [('SUPERVISOR', 'supervisors'), ('LEAD', 'leads'), ('DATA_PROCESSOR', 'processors')]:
+            names = [f'{options["prefix"]}_{role.lower()}_{i:04d}' for i in range(1, options[key] + 1)]
+            existing = set(User.objects.filter(username__in=names).values_list('username', flat=True))
+            User.objects.bulk_create([User(username=n, password=password) for n in names if n not in existing])
+            created = User.objects.filter(username__in=names).exclude(username__in=existing)
+            UserProfile.objects.bulk_create([
+                UserProfile(user=u, role=role, msnv=u.username.upper()) for u in created
+            ])
+            users[role] = list(User.objects.filter(username__in=names).values_list('id', flat=True))
+            self.stdout.write(f'{role}: {len(users[role])} users ({len(names) - len(existing)} new)')
+        return users
+
+    def make_chunk(self, first_batch, first_request, size, users, options):
+        rng, days = self.rng, options['days']
+        batch_rows, request_rows = [], []
+        rid = first_request
+        for bid in range(first_batch, first_batch + size):
+            created = self.now - timedelta(seconds=rng.uniform(0, days * 86400))
+            creator, lead = rng.choice(users['SUPERVISOR']), rng.choice(users['LEAD'])
+            batch_rows.append({
+                'id': bid, 'batch_number': workflow.batch_number_for(bid),
+                'description': f'{rng.choice(REASONS)} #{bid}', 'created_by_id': creator,
+                'created_at': created, 'designated_lead_id': lead,
+            })
+            for _ in range(rng.randint(1, 2 * options['per_batch'] - 1)):
+                request_rows.append(self.make_request(rid, bid, created, creator, lead, users, options))
+                rid += 1
+        return batch_rows, request_rows
+
+    def make_request(self, rid, bid, created, creator, lead, users, options):
+        rng = self.rng
+        age_days = (self.now - created).days
+        weights = next(mix for threshold, mix in STATUS_MIX if age_days >= threshold)
+        status = rng.choices(list(weights), list(weights.values()))[0]
+        row = {
+            'id': rid, 'batch_id': bid, 'msnv': f'NV{rng.randrange(options["employees"]):06d}',
+            'from_group_id': None, 'to_group_id': None,
+            'from_code': f'{rng.randrange(10000, 10200):05d}', 'to_code': f'{rng.randrange(10000, 10200):05d}',
+            'effective_date': (created + timedelta(days=rng.randint(1, 30))).date(),
+            'is_permanent': rng.random() < 0.3, 'status': status, 'requested_by_id': creator,
+            'approved_by_id': None, 'confirmed_by_id': None, 'rejected_by_id': None, 'canceled_by_id': None,
+            'assignee_id': lead if status == 'PENDING' else None, 'rejection_reason': None,
+            'approved_at': None, 'confirmed_at': None, 'rejected_at': None, 'canceled_at': None,
+            'created_at': created,
+        }
+        at = created
+        if status in ('APPROVED', 'CONFIRMED') or (status == 'REJECTED' and rng.random() < 0.5):
+            at = self.later(at)
+            row.update(approved_by_id=lead, approved_at=at)
+        if status == 'CONFIRMED':
+            at = self.later(at)
+            row.update(confirmed_by_id=rng.choice(users['DATA_PROCESSOR']), confirmed_at=at)
+        elif status == 'REJECTED':
+            at = self.later(at)
+            rejecter = rng.choice(users['DATA_PROCESSOR']) if row['approved_by_id'] else lead
+            row.update(rejected_by_id=rejecter, rejected_at=at, rejection_reason='Không đúng nhóm')
+        elif status == 'CANCELED':
+            at = self.later(at)
+            row.update(canceled_by_id=creator, canceled_at=at)
+        row['updated_at'] = at
+        return row
+
+    def later(self, moment):
+        return min(moment + timedelta(hours=self.rng.uniform(0.5, 72)), self.now)
+
+
+def insert_rows(model, rows, batch_size=1000):
+    """executemany() INSERT of attname-keyed dicts with explicit ids.
+
+    Bypasses bulk_create so auto_now_add timestamps keep the generated values.
+    """
+    if not rows:
+        return
+    fields = model._meta.concrete_fields
+    prepared = [f for f in fields if isinstance(f, (models.DateField, models.DateTimeField))]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+    sql = f'INSERT INTO {table} ({columns}) VALUES ({", ".join(["%s"] * len(fields))})'
+    values = []
+    for row in rows:
+        for f in prepared:
+            row[f.attname] = f.get_db_prep_save(row[f.attname], connection)
+        values.append([row[f.attname] for f in fields])
+    with connection.cursor() as cursor:
+        for i in range(0, len(values), batch_size):
+            cursor.executemany(sql, values[i:i + batch_size])
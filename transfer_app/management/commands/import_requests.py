@@ -0,0 +1,46 @@
+import csv
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from transfer_app import importer
+
+
+class Command(BaseCommand):
+    help = 'Stream-import transfer requests (msnv, from_code, to_code, effective_date, is_permanent) from CSV/XLSX into one batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--created-by', required=True, help='Supervisor username')
+        parser.add_argument('--lead', required=True, help='Designated lead username')
+        parser.add_argument('--description', default='')
+        parser.add_argument('--errors', help='Write the per-row error report to this CSV file (default: stderr)')
+        parser.add_argument('--chunk-size', type=int, default=importer.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            supervisor = User.objects.get(username=options['created_by'], profile__role='SUPERVISOR')
+            lead = User.objects.get(username=options['lead'], profile__role='LEAD')
+        except User.DoesNotExist:
+            raise CommandError('--created-by must be a SUPERVISOR and --lead a LEAD')
+
+        report = open(options['errors'], 'w', newline='', encoding='utf-8') if options['errors'] else sys.stderr
+        writer = csv.writer(report)
+        writer.writerow(['line', 'msnv', 'error'])
+        try:
+            with open(options['path'], 'rb') as f:
+                rows = importer.iter_rows(f, options['path'])
+                result = importer.import_rows(
+                    rows, supervisor, lead,
+                    options['description'] or f"Nhập từ tệp {options['path']}",
+                    on_error=writer.writerow, chunk_size=options['chunk_size'],
+                )
+        except importer.READ_ERRORS as e:
+            raise CommandError(f'{e}; nothing was imported')
+        finally:
+            if report is not sys.stderr:
+                report.close()
+
+        batch = result.batch.batch_number if result.batch else '-'
+        self.stdout.write(self.style.SUCCESS(f'Batch {batch}: imported {result.imported} rows, {result.errors} errors'))
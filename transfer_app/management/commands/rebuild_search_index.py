@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from transfer_app import search
+from transfer_app.models import ArchivedBatch, ArchivedTransferRequest, Batch, TransferRequest, SearchTerm
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the accent-folded search index for batch descriptions and MSNVs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        SearchTerm.objects.all().delete()
+        # Archived rows keep their ids and stay searchable for exports
+        sources = [
+            (SearchTerm.KIND_BATCH_DESC, Batch.objects.values_list('id', 'description')),
+            (SearchTerm.KIND_BATCH_DESC, ArchivedBatch.objects.values_list('id', 'description')),
+            (SearchTerm.KIND_MSNV, TransferRequest.objects.values_list('id', 'msnv')),
+            (SearchTerm.KIND_MSNV, ArchivedTransferRequest.objects.values_list('id', 'msnv')),
+        ]
+        for kind, rows in sources:
+            total = 0
+            chunk = []
+            for row in rows.order_by('id').iterator(chunk_size=chunk_size):
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    total += self._flush(kind, chunk)
+            total += self._flush(kind, chunk)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: indexed {total} rows'))
+
+    def _flush(self, kind, chunk):
+        count = len(chunk)
+        with transaction.atomic():
+            search.index_objects(kind, chunk, replace=False)
+        chunk.clear()
+        return count
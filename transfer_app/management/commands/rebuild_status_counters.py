@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from transfer_app import counters
+from transfer_app.models import StatusCounter
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-batch, per-lead and per-requester status counters from TransferRequest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report counters that differ, change nothing')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = 0
+            for scope in counters.SCOPE_FIELDS:
+                expected = {(owner_id, status): n for owner_id, status, n in counters.computed(scope)}
+                stored = {
+                    (owner_id, status): n
+                    for owner_id, status, n in StatusCounter.objects.filter(scope=scope, count__gt=0)
+                    .values_list('owner_id', 'status', 'count')
+                }
+                for key in sorted(set(expected) | set(stored)):
+                    if expected.get(key, 0) != stored.get(key, 0):
+                        drift += 1
+                        self.stdout.write(f'{scope} #{key[0]} {key[1]}: stored={stored.get(key, 0)} actual={expected.get(key, 0)}')
+            style = self.style.WARNING if drift else self.style.SUCCESS
+            self.stdout.write(style(f'{drift} counters differ'))
+            return
+        with transaction.atomic():
+            written = counters.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{written} counters written'))
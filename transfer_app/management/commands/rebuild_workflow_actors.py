@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from transfer_app.archive import REQUEST_MODELS
+from transfer_app.models import WorkflowActor
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the approver/confirmer directory used by the dashboard filters'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            WorkflowActor.objects.all().delete()
+            for action, field in [
+                (WorkflowActor.ACTION_APPROVED, 'approved_by'),
+                (WorkflowActor.ACTION_CONFIRMED, 'confirmed_by'),
+            ]:
+                # Archiving a user's last request must not drop them from the directory
+                user_ids = set()
+                for model in REQUEST_MODELS:
+                    user_ids.update(
+                        model.objects.filter(**{f'{field}__isnull': False})
+                        .order_by().values_list(f'{field}_id', flat=True).distinct()
+                    )
+                WorkflowActor.record(action, user_ids)
+        for action, _ in WorkflowActor.ACTION_CHOICES:
+            count = WorkflowActor.objects.filter(action=action).count()
+            self.stdout.write(self.style.SUCCESS(f'{action}: {count} users'))
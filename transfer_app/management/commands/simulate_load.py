@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from transfer_app import perf
+from transfer_app.management.commands.bench_views import bench_host, git_commit
+from transfer_app.models import TransferRequest
+
+# action: role that performs it (None: any role)
+ACTION_ROLES = {
+    'approve': 'LEAD',
+    'reject': 'LEAD',
+    'confirm': 'DATA_PROCESSOR',
+    'create': 'SUPERVISOR',
+    'dashboard': None,
+}
+DEFAULT_MIX = 'approve=35,reject=5,confirm=20,create=15,dashboard=25'
+MYSQL_DEADLOCK = 1213
+MYSQL_LOCK_WAIT_TIMEOUT = 1205
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ACTION_ROLES:
+            raise CommandError(f'Unknown action {name!r} in --mix (choose from {", ".join(ACTION_ROLES)})')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Bad weight for {name!r} in --mix')
+    return mix
+
+
+def lock_error(exc):
+    """'deadlock', 'lock_timeout' or None for a database error raised by a view."""
+    if not isinstance(exc, OperationalError):
+        return None
+    code = exc.args[0] if exc.args and isinstance(exc.args[0], int) else None
+    text = str(exc).lower()
+    if code == MYSQL_DEADLOCK or 'deadlock' in text:
+        return 'deadlock'
+    if code == MYSQL_LOCK_WAIT_TIMEOUT or 'lock wait timeout' in text or 'database is locked' in text:
+        return 'lock_timeout'
+    return None
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Stats:
+    """Per-action measurements shared by the worker threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.lock_ms = defaultdict(float)
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    def add(self, action, ms, lock_ms, **counts):
+        with self.lock:
+            self.latencies[action].append(ms)
+            self.lock_ms[action] += lock_ms
+            for name, n in counts.items():
+                self.counts[action][name] += n
+
+    def report(self, elapsed):
+        rows = []
+        for action in sorted(self.latencies):
+            times = sorted(self.latencies[action])
+            counts = self.counts[action]
+            rows.append({
+                'action': action,
+                'n': len(times),
+                'per_second': round(len(times) / elapsed, 2),
+                'p50_ms': round(percentile(times, 0.5), 2),
+                'p99_ms': round(percentile(times, 0.99), 2),
+                'max_ms': round(times[-1], 2),
+                'lock_wait_ms': round(self.lock_ms[action], 2),
+                'lock_wait_avg_ms': round(self.lock_ms[action] / len(times), 2),
+                'deadlocks': counts['deadlock'],
+                'lock_timeouts': counts['lock_timeout'],
+                'retries': counts['retry'],
+                'failed': counts['failed'],
+                'errors': counts['error'],
+            })
+        return rows
+
+
+class Command(BaseCommand):
+    help = ('Drive the workflow views with concurrent simulated users and report throughput, latency, '
+            'row-lock waits and deadlocks. Writes to the database: run it on generated data only')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--supervisors', type=int, default=4, help='Concurrent simulated supervisors')
+        parser.add_argument('--leads', type=int, default=8, help='Concurrent simulated leads')
+        parser.add_argument('--processors', type=int, default=4, help='Concurrent simulated data processors')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Action weights (default {DEFAULT_MIX})')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+        parser.add_argument('--selection', type=int, default=100, help='Requests per bulk action')
+        parser.add_argument('--pool', type=int, default=500,
+                            help='Bulk selections are windows of the newest N requests in the needed status '
+                                 '(for a lead: assigned to them); a smaller pool means more overlap between users')
+        parser.add_argument('--create-size', type=int, default=20, help='MSNVs per created batch')
+        parser.add_argument('--think', type=float, default=0, help='Max pause between actions, in ms')
+        parser.add_argument('--retries', type=int, default=3,
+                            help='Times a simulated user repeats an action that hit a deadlock or lock timeout')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default='', help='Also write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.mix = parse_mix(options['mix'])
+        self.host = bench_host()
+        self.stats = Stats()
+        self.errors = []
+        workers = self.make_workers(options)
+        if not workers:
+            raise CommandError('No simulated users: every role has 0 users or no action in --mix')
+        perf.SAMPLE_RATE = 0
+        # Lock errors are expected and counted; don't log a traceback for each
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        self.leads = list(User.objects.filter(profile__role='LEAD').values_list('id', flat=True))
+        self.deadline = time.monotonic() + options['duration']
+        self.stdout.write(f'{len(workers)} simulated users for {options["duration"]:.0f}s, mix {self.mix}')
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=self.work, args=(user, actions, random.Random(options['seed'] + i)), daemon=True)
+            for i, (user, actions) in enumerate(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        rows = self.stats.report(elapsed)
+        for row in rows:
+            self.stdout.write(
+                f'{row["action"]:10s} n={row["n"]:6d} {row["per_second"]:7.1f}/s p50={row["p50_ms"]:8.1f}ms '
+                f'p99={row["p99_ms"]:8.1f}ms lock={row["lock_wait_avg_ms"]:7.1f}ms/op '
+                f'deadlocks={row["deadlocks"]} timeouts={row["lock_timeouts"]} retries={row["retries"]} '
+                f'failed={row["failed"]} errors={row["errors"]}'
+            )
+        for message in self.errors[:5]:
+            self.stderr.write(message)
+        total = sum(row['n'] for row in rows)
+        self.stdout.write(self.style.SUCCESS(f'{total} actions in {elapsed:.1f}s ({total / elapsed:.1f}/s)'))
+        if options['output']:
+            os.makedirs(os.path.dirname(options['output']) or '.', exist_ok=True)
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump({'meta': self.meta(elapsed), 'results': rows}, f, ensure_ascii=False, indent=2)
+
+    def make_workers(self, options):
+        """[(user, [(action, weight)])]: one per simulated user, cycling through that role's accounts."""
+        workers = []
+        for role, key in [('SUPERVISOR', 'supervisors'), ('LEAD', 'leads'), ('DATA_PROCESSOR', 'processors')]:
+            actions = [(a, w) for a, w in self.mix.items() if w > 0 and ACTION_ROLES[a] in (role, None)]
+            if not actions or not options[key]:
+                continue
+            users = list(User.objects.filter(profile__role=role).order_by('id')[:options[key]])
+            if not users:
+                raise CommandError(f'No {role} user: run generate_data first')
+            workers.extend((users[i % len(users)], actions) for i in range(options[key]))
+        return workers
+
+    def work(self, user, actions, rng):
+        client = Client(HTTP_HOST=self.host)
+        client.force_login(user)
+        names, weights = zip(*actions)
+        try:
+            while time.monotonic() < self.deadline:
+                action = rng.choices(names, weights)[0]
+                self.run(client, user, action, rng)
+                if self.options['think']:
+                    time.sleep(rng.uniform(0, self.options['think']) / 1000)
+        finally:
+            connections.close_all()
+
+    def run(self, client, user, action, rng):
+        method, url, data = self.request_for(action, user, rng)
+        counts = defaultdict(int)
+        lock_ms = 0.0
+        started = time.perf_counter()
+        for attempt in range(self.options['retries'] + 1):
+            token = perf.start()
+            try:
+                response = client.post(url, data) if method == 'POST' else client.get(url, data)
+            except Exception as exc:
+                kind = lock_error(exc)
+                if kind is None:
+                    counts['error'] += 1
+                    self.errors.append(f'{action}: {exc!r}')
+                    break
+                counts[kind] += 1
+                if attempt == self.options['retries']:
+                    counts['failed'] += 1
+                    break
+                counts['retry'] += 1
+                time.sleep(rng.uniform(0, 0.05 * (attempt + 1)))
+            else:
+                if response.status_code >= 400:
+                    counts['error'] += 1
+                    self.errors.append(f'{action}: HTTP {response.status_code}')
+                break
+            finally:
+                lock_ms += perf.stop(token).lock_seconds * 1000
+        self.stats.add(action, (time.perf_counter() - started) * 1000, lock_ms, **counts)
+
+    def request_for(self, action, user, rng):
+        """(method, url, data) for one action; bulk selections are windows of a shared pool, so they overlap.
+
+        A lead's pool is the PENDING requests assigned to them, as in their inbox;
+        other leads' requests would only come back as 'not_designated'.
+        """
+        if action == 'dashboard':
+            return 'GET', reverse('transfer_app:dashboard'), {}
+        if action == 'create':
+            return 'POST', reverse('transfer_app:create_request'), {
+                'msnv': ' '.join(f'SIM{rng.randrange(10 ** 6):06d}' for _ in range(self.options['create_size'])),
+                'from_code': '10001', 'to_code': '10002', 'effective_date': timezone.localdate().isoformat(),
+                'batch_description': 'Load simulation', 'designated_lead': rng.choice(self.leads),
+            }
+        if action == 'confirm':
+            qs = TransferRequest.objects.filter(status='APPROVED').order_by('-id')
+        else:
+            # Only PENDING requests carry an assignee (see views.inbox_queryset)
+            qs = TransferRequest.objects.filter(assignee=user).order_by('-created_at')
+        pool = list(qs.values_list('id', flat=True)[:self.options['pool']])
+        size = self.options['selection']
+        start = rng.randrange(max(len(pool) - size, 0) + 1)
+        data = {'action': action, 'ids': pool[start:start + size] or [0]}
+        if action == 'reject':
+            data['reason'] = 'Mô phỏng tải'
+        return 'POST', reverse('transfer_app:bulk_action'), data
+
+    def meta(self, elapsed):
+        options = self.options
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'database': connections['default'].vendor,
+            'elapsed_s': round(elapsed, 2),
+            'users': {key: options[key] for key in ('supervisors', 'leads', 'processors')},
+            'mix': self.mix,
+            'selection': options['selection'],
+            'pool': options['pool'],
+            'create_size': options['create_size'],
+            'think_ms': options['think'],
+            'retries': options['retries'],
+        }
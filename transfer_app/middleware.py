@@ -1,6 +1,16 @@
+import json
+import logging
+import random
+import time
+
 from django.utils import timezone
 from django.conf import settings
 
+from . import perf, replicas
+
+perf_logger = logging.getLogger('transfer_app.perf')
+
+
 class TimezoneActivationMiddleware:
     """Activate configured TIME_ZONE for each request.
     This ensures template localtime filter displays expected local time (Asia/Ho_Chi_Minh).
@@ -12,3 +22,57 @@ class TimezoneActivationMiddleware:
         timezone.activate(settings.TIME_ZONE)
         response = self.get_response(request)
         return response
+
+
+class PerfMiddleware:
+    """Time a sample of requests (TRANSFER_PERF_SAMPLE_RATE): query count and DB
+    time, session-table time, row-lock time, template time, view time and total,
+    sent back as a Server-Timing header and logged as one JSON line on the
+    transfer_app.perf logger, together with the slowest queries and repeated
+    query shapes (N+1).
+    Keep it first in MIDDLEWARE so session saves are inside the measurement.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not perf.SAMPLE_RATE or random.random() >= perf.SAMPLE_RATE:
+            return self.get_response(request)
+        token = perf.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder = perf.stop(token)
+        metrics, record = recorder.summary()
+        response['Server-Timing'] = ', '.join(f'{name};dur={ms:.1f};desc="{desc}"' for name, ms, desc in metrics)
+        record.update(method=request.method, path=request.path, status=response.status_code)
+        level = logging.WARNING if record['n_plus_one'] else logging.INFO
+        perf_logger.log(level, json.dumps(record, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = perf.current()
+        if recorder is not None:
+            recorder.view_started = time.perf_counter()
+        return None
+
+
+class ReplicaMiddleware:
+    """Per-request state for the read-replica router (see replicas.py).
+    A request that wrote anything pins its user to the primary for
+    TRANSFER_REPLICA_STICKY_SECONDS with a short-lived cookie.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = replicas.begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            state = replicas.end_request(token)
+        if state.wrote and replicas.REPLICAS:
+            response.set_cookie(
+                replicas.PIN_COOKIE, '1', max_age=replicas.STICKY_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfer_app', '0006_alter_batch_description'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['-created_at'], name='tr_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['status', '-created_at'], name='tr_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['requested_by', '-created_at'], name='tr_reqby_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['approved_by', '-approved_at'], name='tr_apprby_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['confirmed_by', '-confirmed_at'], name='tr_confby_confirmed_idx'),
+        ),
+    ]
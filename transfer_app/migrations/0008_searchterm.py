@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+
+def backfill_search_terms(apps, schema_editor):
+    from transfer_app.search import index_terms
+    SearchTerm = apps.get_model('transfer_app', 'SearchTerm')
+    Batch = apps.get_model('transfer_app', 'Batch')
+    TransferRequest = apps.get_model('transfer_app', 'TransferRequest')
+    sources = [
+        ('BATCH_DESC', Batch.objects.values_list('id', 'description')),
+        ('MSNV', TransferRequest.objects.values_list('id', 'msnv')),
+    ]
+    for kind, rows in sources:
+        terms = []
+        for object_id, text in rows.iterator(chunk_size=2000):
+            terms.extend(SearchTerm(kind=kind, term=term, object_id=object_id) for term in index_terms(text))
+            if len(terms) >= 5000:
+                SearchTerm.objects.bulk_create(terms)
+                terms = []
+        SearchTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfer_app', '0007_transferrequest_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('BATCH_DESC', 'Batch description'), ('MSNV', 'MSNV')], max_length=10)),
+                ('term', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'term', 'object_id'], name='searchterm_lookup_idx'), models.Index(fields=['kind', 'object_id'], name='searchterm_object_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_search_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_workflow_actors(apps, schema_editor):
+    TransferRequest = apps.get_model('transfer_app', 'TransferRequest')
+    WorkflowActor = apps.get_model('transfer_app', 'WorkflowActor')
+    for action, field in [('APPROVED', 'approved_by'), ('CONFIRMED', 'confirmed_by')]:
+        user_ids = (
+            TransferRequest.objects.filter(**{f'{field}__isnull': False})
+            .order_by().values_list(f'{field}_id', flat=True).distinct()
+        )
+        WorkflowActor.objects.bulk_create([WorkflowActor(action=action, user_id=uid) for uid in user_ids])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transfer_app', '0008_searchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('APPROVED', 'Approved'), ('CONFIRMED', 'Confirmed')], max_length=20)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workflow_actions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='workflowactor',
+            constraint=models.UniqueConstraint(fields=('action', 'user'), name='workflowactor_unique_action_user'),
+        ),
+        migrations.RunPython(backfill_workflow_actors, migrations.RunPython.noop),
+    ]
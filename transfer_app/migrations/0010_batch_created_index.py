@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfer_app', '0009_workflowactor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['-created_at'], name='batch_created_idx'),
+        ),
+    ]
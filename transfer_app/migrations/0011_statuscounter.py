@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_status_counters(apps, schema_editor):
+    TransferRequest = apps.get_model('transfer_app', 'TransferRequest')
+    StatusCounter = apps.get_model('transfer_app', 'StatusCounter')
+    for scope, field in [('BATCH', 'batch_id'), ('LEAD', 'batch__designated_lead_id'), ('REQUESTER', 'requested_by_id')]:
+        rows = (
+            TransferRequest.objects.filter(**{f'{field}__isnull': False})
+            .order_by().values_list(field, 'status').annotate(n=Count('id'))
+        )
+        StatusCounter.objects.bulk_create(
+            [StatusCounter(scope=scope, owner_id=owner_id, status=status, count=n) for owner_id, status, n in rows],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfer_app', '0010_batch_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('BATCH', 'Batch'), ('LEAD', 'Designated lead'), ('REQUESTER', 'Requester')], max_length=10)),
+                ('owner_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Chờ duyệt'), ('APPROVED', 'Đã duyệt'), ('CONFIRMED', 'Đã xác nhận'), ('REJECTED', 'Từ chối'), ('CANCELED', 'Hủy')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statuscounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'owner_id', 'status'), name='statuscounter_unique_owner_status'),
+        ),
+        migrations.RunPython(backfill_status_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_assignee(apps, schema_editor):
+    TransferRequest = apps.get_model('transfer_app', 'TransferRequest')
+    Batch = apps.get_model('transfer_app', 'Batch')
+    TransferRequest.objects.filter(status='PENDING', batch__designated_lead__isnull=False).update(
+        assignee=Subquery(Batch.objects.filter(id=OuterRef('batch_id')).values('designated_lead_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transfer_app', '0011_statuscounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transferrequest',
+            name='assignee',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inbox_requests', to=settings.AUTH_USER_MODEL, verbose_name='Chờ xử lý bởi'),
+        ),
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['assignee', '-created_at'], name='tr_assignee_created_idx'),
+        ),
+        migrations.RunPython(backfill_assignee, migrations.RunPython.noop),
+    ]
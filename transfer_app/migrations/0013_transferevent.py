@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transfer_app', '0012_transferrequest_assignee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransferEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('CREATED', 'Created'), ('TRANSITION', 'Status transition'), ('UPDATED', 'Edited outside the workflow'), ('DELETED', 'Deleted')], max_length=10)),
+                ('request_id', models.BigIntegerField()),
+                ('batch_id', models.BigIntegerField(blank=True, null=True)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(blank=True, max_length=20)),
+                ('reason', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['request_id', 'id'], name='transferevent_request_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transfer_app', '0013_transferevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBatch',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('batch_number', models.CharField(max_length=50, unique=True, verbose_name='Số phiếu')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Lý do chuyển đổi')),
+                ('created_at', models.DateTimeField(verbose_name='Tạo lúc')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Lưu trữ lúc')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người tạo')),
+                ('designated_lead', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Lead duyệt')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTransferRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('msnv', models.CharField(max_length=50, verbose_name='MSNV')),
+                ('from_code', models.CharField(max_length=5, verbose_name='Nhóm hiện tại')),
+                ('to_code', models.CharField(max_length=5, verbose_name='Nhóm chuyển đến')),
+                ('effective_date', models.DateField(verbose_name='Ngày hiệu lực')),
+                ('is_permanent', models.BooleanField(default=False, verbose_name='Chuyển cố định')),
+                ('status', models.CharField(choices=[('PENDING', 'Chờ duyệt'), ('APPROVED', 'Đã duyệt'), ('CONFIRMED', 'Đã xác nhận'), ('REJECTED', 'Từ chối'), ('CANCELED', 'Hủy')], max_length=20, verbose_name='Trạng thái')),
+                ('rejection_reason', models.TextField(blank=True, null=True, verbose_name='Lý do từ chối')),
+                ('approved_at', models.DateTimeField(blank=True, null=True, verbose_name='Duyệt lúc')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='Xác nhận lúc')),
+                ('rejected_at', models.DateTimeField(blank=True, null=True, verbose_name='Từ chối lúc')),
+                ('canceled_at', models.DateTimeField(blank=True, null=True, verbose_name='Hủy lúc')),
+                ('created_at', models.DateTimeField(verbose_name='Tạo lúc')),
+                ('updated_at', models.DateTimeField(verbose_name='Cập nhật lúc')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Lưu trữ lúc')),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người duyệt')),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='transfer_app.archivedbatch', verbose_name='Phiếu')),
+                ('canceled_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người hủy')),
+                ('confirmed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người xác nhận')),
+                ('from_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='transfer_app.group')),
+                ('rejected_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người từ chối')),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Người yêu cầu')),
+                ('to_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='transfer_app.group')),
+            ],
+        ),
+    ]
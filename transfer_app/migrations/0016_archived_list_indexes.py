@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfer_app', '0015_bulkactionresult'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedtransferrequest',
+            index=models.Index(fields=['requested_by', '-created_at'], name='atr_reqby_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtransferrequest',
+            index=models.Index(fields=['approved_by', '-approved_at'], name='atr_apprby_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtransferrequest',
+            index=models.Index(fields=['confirmed_by', '-confirmed_at'], name='atr_confby_confirmed_idx'),
+        ),
+    ]
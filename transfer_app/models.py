@@ -51,6 +51,9 @@ class Batch(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Batch'
         verbose_name_plural = 'Batches'
+        indexes = [
+            models.Index(fields=['-created_at'], name='batch_created_idx'),
+        ]
 
 
 class TransferRequest(models.Model):
@@ -80,6 +83,8 @@ class TransferRequest(models.Model):
     confirmed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='requests_confirmed', verbose_name='Người xác nhận')
     rejected_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='requests_rejected', verbose_name='Người từ chối')
     canceled_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='requests_canceled', verbose_name='Người hủy')
+    # Denormalized from batch.designated_lead while PENDING, NULL otherwise: the lead inbox
+    assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False, related_name='inbox_requests', verbose_name='Chờ xử lý bởi')
 
     rejection_reason = models.TextField(blank=True, null=True, verbose_name='Lý do từ chối')
 
@@ -98,3 +103,199 @@ class TransferRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Transfer Request'
         verbose_name_plural = 'Transfer Requests'
+        # Composite indexes matching the dashboard and "my list" access paths
+        # (filter column first, sort column last) so MySQL avoids filesorts.
+        indexes = [
+            models.Index(fields=['-created_at'], name='tr_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='tr_status_created_idx'),
+            models.Index(fields=['requested_by', '-created_at'], name='tr_reqby_created_idx'),
+            models.Index(fields=['approved_by', '-approved_at'], name='tr_apprby_approved_idx'),
+            models.Index(fields=['confirmed_by', '-confirmed_at'], name='tr_confby_confirmed_idx'),
+            models.Index(fields=['assignee', '-created_at'], name='tr_assignee_created_idx'),
+        ]
+
+
+class WorkflowActor(models.Model):
+    """Distinct users who have approved/confirmed anything (dashboard filter dropdowns)"""
+    ACTION_APPROVED = 'APPROVED'
+    ACTION_CONFIRMED = 'CONFIRMED'
+    ACTION_CHOICES = [
+        (ACTION_APPROVED, 'Approved'),
+        (ACTION_CONFIRMED, 'Confirmed'),
+    ]
+
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='workflow_actions')
+
+    def __str__(self):
+        return f"{self.user.username} ({self.action})"
+
+    @classmethod
+    def record(cls, action, user_ids):
+        """Make sure every user in `user_ids` is listed for `action`."""
+        user_ids = {uid for uid in user_ids if uid}
+        if not user_ids:
+            return
+        known = set(cls.objects.filter(action=action, user_id__in=user_ids).values_list('user_id', flat=True))
+        missing = user_ids - known
+        if missing:
+            cls.objects.bulk_create([cls(action=action, user_id=uid) for uid in missing], ignore_conflicts=True)
+
+    @classmethod
+    def usernames(cls, action):
+        return list(cls.objects.filter(action=action).order_by('user__username').values_list('user__username', flat=True))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['action', 'user'], name='workflowactor_unique_action_user'),
+        ]
+
+
+class StatusCounter(models.Model):
+    """Materialized request count per status for one batch, designated lead or requester (see counters.py)"""
+    SCOPE_BATCH = 'BATCH'
+    SCOPE_LEAD = 'LEAD'
+    SCOPE_REQUESTER = 'REQUESTER'
+    SCOPE_CHOICES = [
+        (SCOPE_BATCH, 'Batch'),
+        (SCOPE_LEAD, 'Designated lead'),
+        (SCOPE_REQUESTER, 'Requester'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    owner_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=TransferRequest.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope}#{self.owner_id} {self.status}: {self.count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'owner_id', 'status'], name='statuscounter_unique_owner_status'),
+        ]
+
+
+class TransferEvent(models.Model):
+    """Append-only change log of transfer requests; `id` is the change-feed sequence (see events.py)"""
+    KIND_CREATED = 'CREATED'
+    KIND_TRANSITION = 'TRANSITION'
+    KIND_UPDATED = 'UPDATED'
+    KIND_DELETED = 'DELETED'
+    KIND_CHOICES = [
+        (KIND_CREATED, 'Created'),
+        (KIND_TRANSITION, 'Status transition'),
+        (KIND_UPDATED, 'Edited outside the workflow'),
+        (KIND_DELETED, 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Plain ids, not foreign keys: events outlive the rows they describe
+    request_id = models.BigIntegerField()
+    batch_id = models.BigIntegerField(null=True, blank=True)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, blank=True)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False, related_name='+')
+    reason = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} request {self.request_id}: {self.from_status} -> {self.to_status}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['request_id', 'id'], name='transferevent_request_idx'),
+        ]
+
+
+class SearchTerm(models.Model):
+    """Accent-folded suffix index used by the dashboard text filters (see search.py)"""
+    KIND_BATCH_DESC = 'BATCH_DESC'
+    KIND_MSNV = 'MSNV'
+    KIND_CHOICES = [
+        (KIND_BATCH_DESC, 'Batch description'),
+        (KIND_MSNV, 'MSNV'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    term = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.kind}:{self.term} -> {self.object_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'term', 'object_id'], name='searchterm_lookup_idx'),
+            models.Index(fields=['kind', 'object_id'], name='searchterm_object_idx'),
+        ]
+
+
+class ArchivedBatch(models.Model):
+    """Cold copy of a finished Batch, same id (see archive.py)"""
+    id = models.BigIntegerField(primary_key=True)
+    batch_number = models.CharField(max_length=50, unique=True, verbose_name='Số phiếu')
+    description = models.TextField(blank=True, null=True, verbose_name='Lý do chuyển đổi')
+    created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='+', verbose_name='Người tạo')
+    created_at = models.DateTimeField(verbose_name='Tạo lúc')
+    designated_lead = models.ForeignKey(User, on_delete=models.PROTECT, null=True, blank=True, related_name='+', verbose_name='Lead duyệt')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Lưu trữ lúc')
+
+    def __str__(self):
+        return f"Phiếu {self.batch_number}"
+
+
+class ArchivedTransferRequest(models.Model):
+    """Cold copy of a CONFIRMED/REJECTED/CANCELED TransferRequest, same id and field names (see archive.py)"""
+    id = models.BigIntegerField(primary_key=True)
+    batch = models.ForeignKey(ArchivedBatch, on_delete=models.SET_NULL, null=True, blank=True, related_name='requests', verbose_name='Phiếu')
+    msnv = models.CharField(max_length=50, verbose_name='MSNV')
+    from_group = models.ForeignKey(Group, on_delete=models.PROTECT, related_name='+', null=True, blank=True)
+    to_group = models.ForeignKey(Group, on_delete=models.PROTECT, related_name='+', null=True, blank=True)
+    from_code = models.CharField(max_length=5, verbose_name='Nhóm hiện tại')
+    to_code = models.CharField(max_length=5, verbose_name='Nhóm chuyển đến')
+    effective_date = models.DateField(verbose_name='Ngày hiệu lực')
+    is_permanent = models.BooleanField(default=False, verbose_name='Chuyển cố định')
+    status = models.CharField(max_length=20, choices=TransferRequest.STATUS_CHOICES, verbose_name='Trạng thái')
+
+    requested_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='+', verbose_name='Người yêu cầu')
+    approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Người duyệt')
+    confirmed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Người xác nhận')
+    rejected_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Người từ chối')
+    canceled_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='Người hủy')
+
+    rejection_reason = models.TextField(blank=True, null=True, verbose_name='Lý do từ chối')
+
+    approved_at = models.DateTimeField(null=True, blank=True, verbose_name='Duyệt lúc')
+    confirmed_at = models.DateTimeField(null=True, blank=True, verbose_name='Xác nhận lúc')
+    rejected_at = models.DateTimeField(null=True, blank=True, verbose_name='Từ chối lúc')
+    canceled_at = models.DateTimeField(null=True, blank=True, verbose_name='Hủy lúc')
+
+    created_at = models.DateTimeField(verbose_name='Tạo lúc')
+    updated_at = models.DateTimeField(verbose_name='Cập nhật lúc')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Lưu trữ lúc')
+
+    def __str__(self):
+        return f"Chuyển #{self.id}: {self.msnv} ({self.status}, lưu trữ)"
+
+    class Meta:
+        # The "my list" access paths, continued into the archive (archive.HotAndCold)
+        indexes = [
+            models.Index(fields=['requested_by', '-created_at'], name='atr_reqby_created_idx'),
+            models.Index(fields=['approved_by', '-approved_at'], name='atr_apprby_approved_idx'),
+            models.Index(fields=['confirmed_by', '-confirmed_at'], name='atr_confby_confirmed_idx'),
+        ]
+
+
+class BulkActionResult(models.Model):
+    """A bulk action's outcome, kept for its result page (see bulk_results.py)"""
+    result_id = models.CharField(max_length=32, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    action = models.CharField(max_length=20)
+    # BulkResult.groups: {outcome code: [request id, ...]}
+    groups = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.action} by {self.user_id} ({self.result_id})"
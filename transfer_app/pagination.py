@@ -0,0 +1,153 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def encode_cursor(direction, value, pk):
+    """Pack a keyset position into an opaque, URL-safe token."""
+    raw = json.dumps([direction, value.isoformat() if value else None, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, value, pk) or None for a missing/garbled token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, value, pk = json.loads(raw)
+        if direction not in ('n', 'p') or value is None:
+            return None
+        return direction, datetime.fromisoformat(value), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+class CountedPaginator(Paginator):
+    """Paginator that trusts a precomputed (cached, exact) row count."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
+
+
+class ProbedPage(Page):
+    """Page whose successor is known from one extra fetched row instead of a total."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        return (self.number - 1) * self.paginator.per_page + 1 if self.object_list else 0
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+class EstimatedPaginator:
+    """Page-number pagination when the row total is only an estimate.
+
+    The estimate (`count`) is a label and nothing else: a page reads per_page
+    + 1 rows and the extra row tells whether there is a next page, so a low
+    estimate cannot hide the last pages and a high one cannot add empty ones.
+    num_pages is unknown (None).
+    """
+    num_pages = None
+
+    def __init__(self, object_list, per_page, count):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.count = count
+
+    def page_slice(self, number):
+        offset = (number - 1) * self.per_page
+        return self.object_list[offset:offset + self.per_page + 1]
+
+    def page(self, rows, number):
+        """The page `number` from the rows of page_slice(number)."""
+        rows = list(rows)
+        return ProbedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+    def get_page(self, number):
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        return self.page(self.page_slice(number), number)
+
+
+class KeysetPage:
+    """Page of results positioned by cursor tokens instead of a page number."""
+
+    def __init__(self, object_list, has_next, has_previous, key):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = self.previous_cursor = ''
+        if object_list:
+            first, last = object_list[0], object_list[-1]
+            if has_next:
+                self.next_cursor = encode_cursor('n', getattr(last, key), last.pk)
+            if has_previous:
+                self.previous_cursor = encode_cursor('p', getattr(first, key), first.pk)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Newest-first pagination over (key, id) without COUNT(*) or OFFSET.
+
+    Every page is a single index range scan, so page N costs the same as
+    page 1 regardless of how deep the user has paged.
+    """
+
+    def __init__(self, queryset, key, per_page):
+        self.queryset = queryset.filter(**{f'{key}__isnull': False})
+        self.key = key
+        self.per_page = per_page
+
+    def get_page(self, token):
+        key, size = self.key, self.per_page
+        cursor = decode_cursor(token)
+        if cursor is None:
+            rows = list(self.queryset.order_by(f'-{key}', '-id')[:size + 1])
+            return KeysetPage(rows[:size], len(rows) > size, False, key)
+
+        direction, value, pk = cursor
+        if direction == 'n':
+            qs = self.queryset.filter(
+                Q(**{f'{key}__lt': value}) | Q(**{key: value, 'id__lt': pk})
+            ).order_by(f'-{key}', '-id')
+            rows = list(qs[:size + 1])
+            return KeysetPage(rows[:size], len(rows) > size, True, key)
+
+        qs = self.queryset.filter(
+            Q(**{f'{key}__gt': value}) | Q(**{key: value, 'id__gt': pk})
+        ).order_by(key, 'id')
+        rows = list(qs[:size + 1])
+        has_previous = len(rows) > size
+        rows = rows[:size]
+        rows.reverse()
+        return KeysetPage(rows, True, has_previous, key)
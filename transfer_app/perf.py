@@ -0,0 +1,144 @@
+"""Per-request performance recording for PerfMiddleware (see middleware.py).
+
+A sampled request gets a Recorder in a context variable. Every database
+connection carries one execute wrapper (installed when it connects) that
+times queries into the current recorder, so queries run from the async
+views' worker threads are counted too; without a recorder the wrapper is a
+single context-variable lookup. Template time is taken in
+TimedDjangoTemplates, the project's template backend.
+
+Time spent in SELECT ... FOR UPDATE (waiting for and taking row locks) is
+also kept apart, as `lock`.
+
+Query shapes are the parametrized SQL with IN-lists collapsed; a shape
+repeated N_PLUS_ONE_THRESHOLD times within one request (e.g. a lazy FK load
+per row) is reported as a likely N+1.
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+SAMPLE_RATE = getattr(settings, 'TRANSFER_PERF_SAMPLE_RATE', 0.0)
+N_PLUS_ONE_THRESHOLD = getattr(settings, 'TRANSFER_PERF_N_PLUS_ONE_THRESHOLD', 5)
+SLOWEST_KEPT = 3
+SESSION_TABLE = 'django_session'
+LOCKING_CLAUSE = ' FOR UPDATE'
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class Recorder:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.session_seconds = 0.0
+        self.lock_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.shapes = Counter()
+        self.slowest = []  # [(seconds, sql)], longest first
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        if SESSION_TABLE in sql:
+            self.session_seconds += seconds
+        if LOCKING_CLAUSE in sql:
+            self.lock_seconds += seconds
+        self.shapes[IN_LIST_RE.sub('IN (...)', sql)] += 1
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest = sorted(self.slowest + [(seconds, sql)], reverse=True)[:SLOWEST_KEPT]
+
+    def repeated_shapes(self):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= N_PLUS_ONE_THRESHOLD]
+
+    def summary(self):
+        """(Server-Timing metrics as (name, ms, description), log record dict)."""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        view_ms = (time.perf_counter() - self.view_started) * 1000 if self.view_started else None
+        metrics = [
+            ('db', self.db_seconds * 1000, f'{self.queries} queries'),
+            ('session', self.session_seconds * 1000, 'session table'),
+            ('lock', self.lock_seconds * 1000, 'row locks'),
+            ('tpl', self.template_seconds * 1000, 'templates'),
+        ]
+        if view_ms is not None:
+            metrics.append(('view', view_ms, 'view'))
+        metrics.append(('total', total_ms, 'total'))
+        record = {name: round(ms, 2) for name, ms, _ in metrics}
+        record['queries'] = self.queries
+        record['slowest'] = [{'ms': round(s * 1000, 2), 'sql': sql[:300]} for s, sql in self.slowest]
+        record['n_plus_one'] = [{'count': n, 'sql': shape[:300]} for shape, n in self.repeated_shapes()]
+        return metrics, record
+
+
+_recorder = ContextVar('transfer_perf_recorder', default=None)
+
+
+def start():
+    return _recorder.set(Recorder())
+
+
+def stop(token):
+    recorder = _recorder.get()
+    _recorder.reset(token)
+    return recorder
+
+
+def current():
+    return _recorder.get()
+
+
+def timed_execute(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(timed_execute)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        recorder = _recorder.get()
+        if recorder is None:
+            return super().render(context, request)
+        # Only the outermost render counts; nested render_to_string calls are inside it
+        recorder.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            recorder.template_depth -= 1
+            if not recorder.template_depth:
+                recorder.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time recorded for sampled requests."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,189 @@
+"""Server-Sent Events notifications ("new work for you") fed by the TransferEvent log.
+
+Each ASGI worker runs one Hub. While anybody is connected its poller reads
+the TransferEvents after its cursor (one query per TRANSFER_PUSH_POLL_SECONDS
+for the whole process, however many clients there are), turns them into
+per-batch notifications and puts each on the queues of the users it
+concerns. Events written in this process wake the poller right after commit
+(publish(), called by events.py), so local changes are pushed at once and
+changes made by other workers arrive within one poll; no broker is needed.
+
+An idle connection is a coroutine waiting on its queue: no thread and no
+database connection. A notification only tells the page to reload; the
+dashboard stays the source of truth.
+"""
+import asyncio
+import json
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+
+from .models import Batch, TransferEvent, TransferRequest
+
+POLL_SECONDS = getattr(settings, 'TRANSFER_PUSH_POLL_SECONDS', 2)
+HEARTBEAT_SECONDS = 25
+# Django 4.2 does not notice a client going away while a response streams,
+# so each stream ends after this long and EventSource reconnects by itself.
+MAX_STREAM_SECONDS = getattr(settings, 'TRANSFER_PUSH_MAX_STREAM_SECONDS', 300)
+RETRY_MS = 3000
+QUEUE_SIZE = 100
+FETCH_LIMIT = 1000
+
+
+def notifications(event_rows):
+    """[(event id, type, audience, payload)] for TransferEvent rows (id, kind, request_id, batch_id, to_status).
+
+    audience is ('user', user id) or ('role', role). Events are grouped per
+    batch, so a bulk action over 500 requests is one notification.
+    """
+    groups = defaultdict(list)
+    for event_id, kind, request_id, batch_id, to_status in event_rows:
+        if kind == TransferEvent.KIND_CREATED and batch_id:
+            groups['batch_assigned', batch_id].append((event_id, request_id))
+        elif kind == TransferEvent.KIND_TRANSITION and to_status == 'APPROVED':
+            groups['ready_to_confirm', batch_id].append((event_id, request_id))
+        elif kind == TransferEvent.KIND_TRANSITION and to_status == 'REJECTED':
+            groups['rejected', batch_id].append((event_id, request_id))
+    if not groups:
+        return []
+    batches = {
+        bid: (number, lead_id)
+        for bid, number, lead_id in Batch.objects.filter(id__in={bid for _, bid in groups if bid})
+        .values_list('id', 'batch_number', 'designated_lead_id')
+    }
+    rejected_ids = [rid for (kind, _), items in groups.items() if kind == 'rejected' for _, rid in items]
+    requesters = dict(TransferRequest.objects.filter(id__in=rejected_ids).values_list('id', 'requested_by_id'))
+    result = []
+    for (kind, batch_id), items in groups.items():
+        number, lead_id = batches.get(batch_id, ('', None))
+        last_id = max(event_id for event_id, _ in items)
+        payload = {'batch_id': batch_id, 'batch_number': number, 'count': len(items)}
+        if kind == 'batch_assigned':
+            if lead_id:
+                payload['message'] = f'Phiếu {number}: {len(items)} yêu cầu mới chờ bạn duyệt'
+                result.append((last_id, kind, ('user', lead_id), payload))
+        elif kind == 'ready_to_confirm':
+            payload['message'] = f'Phiếu {number}: {len(items)} yêu cầu đã duyệt, chờ xác nhận'
+            result.append((last_id, kind, ('role', 'DATA_PROCESSOR'), payload))
+        else:
+            by_requester = defaultdict(int)
+            for _, rid in items:
+                if requesters.get(rid):
+                    by_requester[requesters[rid]] += 1
+            for user_id, n in by_requester.items():
+                data = dict(payload, count=n, message=f'Phiếu {number}: {n} yêu cầu bị từ chối')
+                result.append((last_id, kind, ('user', user_id), data))
+    result.sort(key=lambda note: note[0])
+    return result
+
+
+def read_events(after, upto=None):
+    """(notifications, new cursor) for the events after `after` (and up to `upto`)."""
+    close_old_connections()
+    try:
+        if after is None:
+            return [], TransferEvent.objects.aggregate(m=Max('id'))['m'] or 0
+        qs = TransferEvent.objects.filter(id__gt=after)
+        if upto is not None:
+            qs = qs.filter(id__lte=upto)
+        rows = list(qs.order_by('id').values_list('id', 'kind', 'request_id', 'batch_id', 'to_status')[:FETCH_LIMIT])
+        return notifications(rows), rows[-1][0] if rows else after
+    finally:
+        close_old_connections()
+
+
+fetch = sync_to_async(read_events, thread_sensitive=False)
+
+
+class Hub:
+    """Per-process fan-out of notifications to the connected streams."""
+
+    def __init__(self):
+        self.subscribers = {}  # queue -> (user id, role)
+        self.cursor = None
+        self.loop = None
+        self.wakeup = None
+        self.poller = None
+
+    async def subscribe(self, user_id, role):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop, self.wakeup, self.poller, self.cursor = loop, asyncio.Event(), None, None
+        if self.cursor is None:
+            _, self.cursor = await fetch(None)
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers[queue] = (user_id, role)
+        if self.poller is None or self.poller.done():
+            self.poller = loop.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.pop(queue, None)
+
+    def publish(self):
+        """Wake the poller now; safe to call from any thread (transaction.on_commit)."""
+        loop, wakeup = self.loop, self.wakeup
+        if loop is not None and self.subscribers and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            notes, self.cursor = await fetch(self.cursor)
+            for note in notes:
+                self.deliver(note)
+
+    def deliver(self, note, only=None):
+        _, _, (kind, target), _ = note
+        for queue, (user_id, role) in list(self.subscribers.items()):
+            if only is not None and queue is not only:
+                continue
+            if (kind == 'user' and user_id == target) or (kind == 'role' and role == target):
+                try:
+                    queue.put_nowait(note)
+                except asyncio.QueueFull:
+                    pass  # a stalled client only needs to know there is something new
+
+
+HUB = Hub()
+
+
+def publish():
+    HUB.publish()
+
+
+def format_event(note):
+    event_id, kind, _, payload = note
+    return f'id: {event_id}\nevent: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n'
+
+
+async def stream(user_id, role, last_event_id=None):
+    """The text/event-stream body for one connected user."""
+    queue = await HUB.subscribe(user_id, role)
+    # Everything after this cursor reaches the queue through the poller
+    joined_at = HUB.cursor
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_STREAM_SECONDS
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        # Replay what a reconnecting client missed before it joined
+        if last_event_id is not None and last_event_id < joined_at:
+            notes, _ = await fetch(last_event_id, joined_at)
+            for note in notes:
+                HUB.deliver(note, only=queue)
+        while loop.time() < deadline:
+            try:
+                note = await asyncio.wait_for(queue.get(), min(HEARTBEAT_SECONDS, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_event(note)
+    finally:
+        HUB.unsubscribe(queue)
@@ -0,0 +1,72 @@
+"""Presentation values computed once per request instead of once per template call.
+
+render_now() fixes "now" for the whole request; decorate_requests() and
+decorate_batches() attach the age label, the "old" flag and the status badge
+to the objects before the template loops over them, so the templates only
+print attributes (see the status_badge inclusion tag in transfer_extras).
+"""
+from django.utils import timezone
+
+OLD_AFTER_DAYS = 30
+
+# status: (badge CSS classes, label)
+STATUS_BADGES = {
+    'PENDING': ('bg-warning text-dark', 'Chờ duyệt'),
+    'APPROVED': ('bg-info', 'Đã duyệt'),
+    'CONFIRMED': ('bg-success', 'Hoàn tất'),
+    'REJECTED': ('bg-danger', 'Từ chối'),
+    'CANCELED': ('bg-secondary', 'Đã hủy'),
+}
+
+
+def render_now(request):
+    now = getattr(request, '_render_now', None)
+    if now is None:
+        now = request._render_now = timezone.now()
+    return now
+
+
+def age_label(dt, now):
+    if not dt:
+        return ''
+    diff = now - dt
+    seconds = int(diff.total_seconds())
+    minutes = seconds // 60
+    hours = minutes // 60
+    days = diff.days
+    if seconds < 60:
+        return f"{seconds}s trước"
+    if minutes < 60:
+        return f"{minutes} phút trước"
+    if hours < 24:
+        return f"{hours} giờ trước"
+    if days < 30:
+        return f"{days} ngày trước"
+    months = days // 30
+    return f"{months} tháng trước"
+
+
+def is_old(dt, now):
+    return bool(dt) and (now - dt).days >= OLD_AFTER_DAYS
+
+
+def status_badge(status):
+    return STATUS_BADGES.get(status, ('bg-secondary', status))
+
+
+def decorate_requests(rows, now, time_field='created_at'):
+    """Set .badge_class, .badge_label and .age (from `time_field`) on each request."""
+    for row in rows:
+        row.badge_class, row.badge_label = status_badge(row.status)
+        row.age = age_label(getattr(row, time_field), now)
+    return rows
+
+
+def decorate_batches(batches, now):
+    """Set 'age', 'is_old' on the batch block dicts and decorate their requests."""
+    for data in batches:
+        created = data['batch'].created_at
+        data['age'] = age_label(created, now)
+        data['is_old'] = is_old(created, now)
+        decorate_requests(data['requests'], now)
+    return batches
@@ -0,0 +1,109 @@
+"""Route the reads of list/report views to read replicas.
+
+Only views wrapped in read_replica() read from a replica, and only on
+GET/HEAD. Inside them the router picks one alias from TRANSFER_READ_REPLICAS
+for the whole request. Everything else stays on `default`: writes,
+select_for_update() (Django routes it as a write), reads inside an atomic
+block, and sessions. ReplicaMiddleware notices a user's own write and sets a
+short-lived cookie; while it is present that user reads from the primary
+too, so a page shown right after an approval never lags behind it.
+
+The per-request state lives in a context variable, which asgiref carries
+into the worker threads of the async views.
+"""
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICAS = list(getattr(settings, 'TRANSFER_READ_REPLICAS', []))
+STICKY_SECONDS = getattr(settings, 'TRANSFER_REPLICA_STICKY_SECONDS', 10)
+PIN_COOKIE = 'transfer_primary'
+# Written on most requests; must never be read back stale
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+class RequestState:
+    __slots__ = ('read_alias', 'wrote')
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+_state = ContextVar('transfer_db_state', default=None)
+
+
+def begin_request():
+    return _state.set(RequestState())
+
+
+def end_request(token):
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+def current_alias():
+    """The replica this request reads from, or None for the default routing."""
+    state = _state.get()
+    return state.read_alias if state else None
+
+
+@contextmanager
+def replica_reads(request):
+    state = _state.get()
+    usable = (
+        state is not None and REPLICAS and request.method in ('GET', 'HEAD')
+        and PIN_COOKIE not in request.COOKIES
+    )
+    if usable:
+        state.read_alias = random.choice(REPLICAS)
+    try:
+        yield
+    finally:
+        if usable:
+            state.read_alias = None
+
+
+def read_replica(view):
+    """Let `view` (sync or async) read from a replica."""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with replica_reads(request):
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(request):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.read_alias is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        if state.wrote or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
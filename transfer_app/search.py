@@ -0,0 +1,87 @@
+"""Accent-folded term index for the dashboard `desc` and `msnv` filters.
+
+Every word of Batch.description and every TransferRequest.msnv is folded
+(lowercase, Vietnamese diacritics stripped, đ -> d) and stored together with
+all of its suffixes in SearchTerm. A prefix lookup on a suffix is a substring
+match, so `term LIKE 'x%'` on the (kind, term) index gives the same results
+as the old `icontains` scan without touching the joined TEXT column.
+Queries with punctuation ('NV-001') keep the old substring meaning: the
+index only narrows the candidates and `icontains` decides.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+
+from .models import SearchTerm
+
+TERM_MAX_LENGTH = 50
+INSERT_BATCH_SIZE = 5000
+WORD_RE = re.compile(r'[a-z0-9]+')
+# Anything tokenize() would split on besides whitespace
+PUNCTUATION_RE = re.compile(r'[^\w\s]|_')
+
+
+def fold(text):
+    """Lowercase and strip diacritics: 'Chuyển Đổi' -> 'chuyen doi'."""
+    text = (text or '').lower().replace('đ', 'd')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return [word[:TERM_MAX_LENGTH] for word in WORD_RE.findall(fold(text))]
+
+
+def index_terms(text):
+    terms = set()
+    for word in tokenize(text):
+        terms.update(word[i:] for i in range(len(word)))
+    return terms
+
+
+def index_objects(kind, pairs, replace=True):
+    """(Re)index (object_id, text) pairs of one kind.
+
+    Terms are written with a plain executemany() rather than bulk_create so
+    large imports do not pay for building a model instance per term.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    if replace:
+        SearchTerm.objects.filter(kind=kind, object_id__in=[oid for oid, _ in pairs]).delete()
+    table = connection.ops.quote_name(SearchTerm._meta.db_table)
+    sql = f'INSERT INTO {table} (kind, term, object_id) VALUES (%s, %s, %s)'
+    rows = [(kind, term, oid) for oid, text in pairs for term in index_terms(text)]
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            cursor.executemany(sql, rows[i:i + INSERT_BATCH_SIZE])
+
+
+def index_batch(batch, replace=True):
+    index_objects(SearchTerm.KIND_BATCH_DESC, [(batch.id, batch.description)], replace)
+
+
+def index_requests(requests, replace=True):
+    index_objects(SearchTerm.KIND_MSNV, [(tr.id, tr.msnv) for tr in requests], replace)
+
+
+def unindex(kind, object_ids):
+    SearchTerm.objects.filter(kind=kind, object_id__in=list(object_ids)).delete()
+
+
+def search_filter(qs, field, kind, query, text_field):
+    """Restrict `qs` to rows whose `field` id matches every token of `query`.
+
+    `text_field` is the indexed column itself; a query with punctuation, or
+    with no letters or digits at all, must also occur in it as typed.
+    """
+    query = query.strip()
+    tokens = tokenize(query)
+    for token in tokens:
+        matches = SearchTerm.objects.filter(kind=kind, term__istartswith=token).values('object_id')
+        qs = qs.filter(**{f'{field}__in': matches})
+    if not tokens or PUNCTUATION_RE.search(query):
+        qs = qs.filter(**{f'{text_field}__icontains': query})
+    return qs
@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import search, counts, counters, events, fragments
+from .models import Batch, TransferRequest, SearchTerm, WorkflowActor, StatusCounter, TransferEvent
+
+
+@receiver(post_save, sender=Batch)
+def index_batch_description(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or 'description' in update_fields:
+        search.index_batch(instance, replace=not created)
+
+
+@receiver(post_save, sender=TransferRequest)
+def index_request_msnv(sender, instance, created, update_fields=None, **kwargs):
+    # Workflow transitions save with update_fields, so they skip reindexing
+    if created or update_fields is None or 'msnv' in update_fields:
+        search.index_requests([instance], replace=not created)
+
+
+@receiver(post_save, sender=TransferRequest)
+def record_workflow_actors(sender, instance, update_fields=None, **kwargs):
+    if instance.approved_by_id and (update_fields is None or 'approved_by' in update_fields):
+        WorkflowActor.record(WorkflowActor.ACTION_APPROVED, [instance.approved_by_id])
+    if instance.confirmed_by_id and (update_fields is None or 'confirmed_by' in update_fields):
+        WorkflowActor.record(WorkflowActor.ACTION_CONFIRMED, [instance.confirmed_by_id])
+
+
+@receiver(post_save, sender=TransferRequest)
+@receiver(post_delete, sender=TransferRequest)
+def invalidate_dashboard_counts(sender, **kwargs):
+    counts.invalidate()
+
+
+@receiver(post_save, sender=TransferRequest)
+@receiver(post_delete, sender=TransferRequest)
+def bump_request_batch_version(sender, instance, **kwargs):
+    if instance.batch_id:
+        transaction.on_commit(lambda: fragments.bump_batch_versions([instance.batch_id]))
+
+
+@receiver(post_save, sender=Batch)
+def bump_batch_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: fragments.bump_batch_versions([instance.id]))
+
+
+def designated_lead_id(batch_id):
+    if not batch_id:
+        return None
+    return Batch.objects.filter(id=batch_id).values_list('designated_lead_id', flat=True).first()
+
+
+@receiver(pre_save, sender=TransferRequest)
+def set_request_assignee(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Full saves (admin, shell); workflow writes set the assignee themselves
+    if update_fields is None and not raw:
+        instance.assignee_id = designated_lead_id(instance.batch_id) if instance.status == 'PENDING' else None
+
+
+@receiver(post_save, sender=Batch)
+def sync_batch_assignees(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        TransferRequest.objects.filter(batch=instance, status='PENDING').exclude(
+            assignee_id=instance.designated_lead_id
+        ).update(assignee_id=instance.designated_lead_id)
+
+
+# Workflow transitions and bulk inserts update the counters themselves (see
+# workflow.py); these cover single rows created or deleted through the ORM.
+@receiver(post_save, sender=TransferRequest)
+def count_created_request(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.record_added([counters.request_row(instance, designated_lead_id(instance.batch_id))])
+
+
+@receiver(post_delete, sender=TransferRequest)
+def count_deleted_request(sender, instance, **kwargs):
+    counters.record_removed([counters.request_row(instance, designated_lead_id(instance.batch_id))])
+
+
+@receiver(pre_delete, sender=Batch)
+def drop_batch_counters(sender, instance, **kwargs):
+    # Its requests are detached (SET_NULL), so they stop counting for the lead
+    # and leave the lead's inbox too
+    instance.requests.filter(assignee__isnull=False).update(assignee=None)
+    batch_counts = counters.counts_for(StatusCounter.SCOPE_BATCH, [instance.id])[instance.id]
+    if instance.designated_lead_id:
+        counters.apply_deltas({
+            (StatusCounter.SCOPE_LEAD, instance.designated_lead_id, status): -n
+            for status, n in batch_counts.items() if status != 'total'
+        })
+    StatusCounter.objects.filter(scope=StatusCounter.SCOPE_BATCH, owner_id=instance.id).delete()
+
+
+# Same split for the change feed: workflow.py logs its own writes, these log
+# single ORM creates/deletes and the requests a deleted batch leaves behind.
+@receiver(post_save, sender=TransferRequest)
+def log_created_request(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.record_created(instance.batch_id, [(instance.pk, instance.status, instance.requested_by_id)])
+
+
+@receiver(post_delete, sender=TransferRequest)
+def log_deleted_request(sender, instance, **kwargs):
+    events.record(TransferEvent.KIND_DELETED, instance.pk, instance.batch_id, from_status=instance.status)
+
+
+@receiver(pre_delete, sender=Batch)
+def log_detached_requests(sender, instance, **kwargs):
+    TransferEvent.objects.bulk_create([
+        TransferEvent(kind=TransferEvent.KIND_UPDATED, request_id=rid, batch_id=None, from_status=status, to_status=status)
+        for rid, status in instance.requests.values_list('id', 'status')
+    ], batch_size=1000)
+
+
+@receiver(post_delete, sender=Batch)
+def unindex_batch(sender, instance, **kwargs):
+    search.unindex(SearchTerm.KIND_BATCH_DESC, [instance.id])
+
+
+@receiver(post_delete, sender=TransferRequest)
+def unindex_request(sender, instance, **kwargs):
+    search.unindex(SearchTerm.KIND_MSNV, [instance.id])
@@ -1,32 +1,35 @@
 from django import template
 from django.utils import timezone
 
+from transfer_app import rendering
+
 register = template.Library()
 
 @register.filter
-def relative_time(dt):
-    if not dt:
+def relative_time(dt, now=None):
+    """Age label ("5 phút trước"); pass the request's render time as `now` when available."""
+    return rendering.age_label(dt, now or timezone.now())
+
+@register.filter
+def approx_count(n):
+    """Compact estimate: 123456 -> '~123k'"""
+    if n is None:
         return ''
-    now = timezone.now()
-    diff = now - dt
-    seconds = int(diff.total_seconds())
-    minutes = seconds // 60
-    hours = minutes // 60
-    days = diff.days
-    if seconds < 60:
-        return f"{seconds}s trước"
-    if minutes < 60:
-        return f"{minutes} phút trước"
-    if hours < 24:
-        return f"{hours} giờ trước"
-    if days < 30:
-        return f"{days} ngày trước"
-    months = days // 30
-    return f"{months} tháng trước"
+    if n >= 1000000:
+        return f"~{n / 1000000:.1f}M"
+    if n >= 1000:
+        return f"~{n // 1000}k"
+    return f"~{n}"
 
 @register.filter
-def is_old(dt):
+def is_old(dt, now=None):
     """Return True if age >= 30 days"""
-    if not dt:
-        return False
-    return (timezone.now() - dt).days >= 30
\ No newline at end of file
+    return rendering.is_old(dt, now or timezone.now())
+
+@register.inclusion_tag('transfer_app/_status_badge.html')
+def status_badge(req):
+    """Status badge; uses the badge computed by rendering.decorate_requests when present."""
+    if hasattr(req, 'badge_class'):
+        return {'css': req.badge_class, 'label': req.badge_label}
+    css, label = rendering.status_badge(req.status)
+    return {'css': css, 'label': label}
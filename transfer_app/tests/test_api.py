@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from transfer_app import archive, workflow
+from transfer_app.models import ArchivedBatch, TransferRequest, UserProfile
+
+
+class RequestListTests(TransactionTestCase):
+    # Transactional: the API reads through the replica connection
+    databases = '__all__'
+
+    def setUp(self):
+        user = User.objects.create(username='api-sv')
+        UserProfile.objects.create(user=user, role='SUPERVISOR')
+        self.client.force_login(user)
+
+    def test_bad_batch_id_is_a_client_error(self):
+        response = self.client.get(reverse('transfer_app:api_request_list'), {'batch': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'batch must be a batch id'})
+
+    def test_batch_filter(self):
+        response = self.client.get(reverse('transfer_app:api_request_list'), {'batch': '1'})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_head_is_allowed(self):
+        for name, args in [('api_request_list', []), ('api_request_detail', [1]), ('api_batch_list', []),
+                           ('api_batch_detail', [1]), ('api_event_feed', [])]:
+            with self.subTest(name):
+                self.assertNotEqual(self.client.head(reverse(f'transfer_app:{name}', args=args)).status_code, 405)
+        self.assertEqual(self.client.post(reverse('transfer_app:api_request_list')).status_code, 405)
+
+
+class ArchivedBatchDetailTests(TransactionTestCase):
+    databases = '__all__'
+
+    def test_archived_batch_and_requests(self):
+        sv = User.objects.create(username='api-arch-sv')
+        UserProfile.objects.create(user=sv, role='SUPERVISOR')
+        batch = workflow.create_batch(sv, None, 'Archived')
+        workflow.insert_requests(batch, [
+            TransferRequest(msnv=f'AR{i}', effective_date=timezone.localdate(), requested_by=sv) for i in range(2)
+        ])
+        batch.requests.update(status='CONFIRMED')
+        self.assertEqual(archive.archive_batches([batch.id], timezone.now() + timedelta(days=1)), (1, 2))
+        self.assertTrue(ArchivedBatch.objects.filter(id=batch.id).exists())
+        self.client.force_login(sv)
+        response = self.client.get(reverse('transfer_app:api_batch_detail', args=[batch.id]), {'fields': 'msnv,status'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['batch_number'], batch.batch_number)
+        self.assertEqual([(r['msnv'], r['status']) for r in data['requests']], [('AR0', 'CONFIRMED'), ('AR1', 'CONFIRMED')])
+
+    def test_unknown_batch(self):
+        user = User.objects.create(username='api-arch-none')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse('transfer_app:api_batch_detail', args=[999])).status_code, 404)
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from transfer_app import bulk_results
+from transfer_app.models import BulkActionResult
+from transfer_app.workflow import BulkResult
+
+
+class BulkResultStoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = User.objects.create(username='br-1'), User.objects.create(username='br-2')
+
+    def save(self):
+        result = BulkResult('approve')
+        result.add('approved', 1)
+        result.add('missing', 'abc')
+        return bulk_results.save(self.user.id, result)
+
+    def test_round_trip_for_its_owner_only(self):
+        result_id = self.save()
+        loaded = bulk_results.load(self.user.id, result_id)
+        self.assertEqual((loaded.action, loaded.groups), ('approve', {'approved': [1], 'missing': ['abc']}))
+        self.assertIsNone(bulk_results.load(self.other.id, result_id))
+
+    def test_expired_results_are_gone(self):
+        result_id = self.save()
+        stale = timezone.now() - timedelta(seconds=bulk_results.RESULT_TTL + 1)
+        BulkActionResult.objects.update(created_at=stale)
+        self.assertIsNone(bulk_results.load(self.user.id, result_id))
+        self.save()
+        self.assertFalse(BulkActionResult.objects.filter(result_id=result_id).exists())
@@ -0,0 +1,18 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from transfer_app import fragments, workflow
+
+
+class BlockKeyTests(TestCase):
+    def test_batch_edits_change_the_key_without_a_bump(self):
+        # A worker whose local cache missed the version bump must not serve the old block
+        sv, lead = User.objects.create(username='fr-sv'), User.objects.create(username='fr-lead')
+        batch = workflow.create_batch(sv, None, 'Before')
+        data = {'batch': batch, 'age': '1 phút trước', 'is_old': False, 'requests': []}
+        before = fragments.block_key(data, 3, 'LEAD')
+        batch.description = 'After'
+        edited = fragments.block_key(data, 3, 'LEAD')
+        batch.designated_lead = lead
+        reassigned = fragments.block_key(data, 3, 'LEAD')
+        self.assertEqual(len({before, edited, reassigned}), 3)
@@ -0,0 +1,47 @@
+import io
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from transfer_app import importer
+from transfer_app.models import Batch, SearchTerm, StatusCounter, TransferRequest, UserProfile
+
+HEADER = b'msnv,from_code,to_code,effective_date,is_permanent\r\n'
+
+
+def csv_rows(body):
+    return importer.iter_rows(io.BytesIO(body), 'import.csv')
+
+
+class ImportRowsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sv, cls.lead = User.objects.create(username='imp-sv'), User.objects.create(username='imp-lead')
+        UserProfile.objects.create(user=cls.sv, role='SUPERVISOR')
+        UserProfile.objects.create(user=cls.lead, role='LEAD')
+
+    def run_import(self, body, **kwargs):
+        return importer.import_rows(csv_rows(body), self.sv, self.lead, 'Import', **kwargs)
+
+    def test_imports_valid_rows_and_reports_errors(self):
+        errors = []
+        body = HEADER + b''.join(b'IM%03d,10001,10002,2026-01-31,\r\n' % i for i in range(5)) + b',10001,10002,,\r\n'
+        result = self.run_import(body, on_error=errors.append, chunk_size=2)
+        self.assertEqual((result.imported, result.errors), (5, 1))
+        self.assertEqual(result.batch.requests.count(), 5)
+        self.assertEqual([(e.line, e.error) for e in errors], [(7, 'Thiếu MSNV')])
+
+    def test_bad_header_creates_no_batch(self):
+        with self.assertRaises(importer.ImportFormatError):
+            self.run_import(b'msnv,from_code\r\nIM001,10001\r\n')
+        self.assertFalse(Batch.objects.exists())
+
+    def test_read_error_midway_discards_committed_chunks(self):
+        # The bad bytes lie well past the first decoded block, so several chunks are committed before them
+        body = HEADER + b''.join(b'IM%04d,10001,10002,2026-01-31,\r\n' % i for i in range(2000)) + b'\xff\xfe,1,2,,\r\n'
+        with self.assertRaises(UnicodeDecodeError):
+            self.run_import(body, chunk_size=100)
+        self.assertFalse(Batch.objects.exists())
+        self.assertFalse(TransferRequest.objects.exists())
+        self.assertFalse(StatusCounter.objects.exclude(count=0).exists())
+        self.assertFalse(SearchTerm.objects.filter(kind=SearchTerm.KIND_MSNV).exists())
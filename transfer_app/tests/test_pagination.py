@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from transfer_app import archive, counts, workflow
+from transfer_app.models import TransferRequest, UserProfile
+from transfer_app.pagination import EstimatedPaginator
+
+
+def make_requests(n=45):
+    user = User.objects.create(username='page-sv')
+    UserProfile.objects.create(user=user, role='SUPERVISOR', msnv='PG1')
+    TransferRequest.objects.bulk_create([
+        TransferRequest(msnv=f'PG{i:03d}', effective_date=timezone.localdate(), requested_by=user)
+        for i in range(n)
+    ])
+    return user
+
+
+class EstimatedPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_requests()
+        cls.qs = TransferRequest.objects.order_by('id')
+
+    def test_low_estimate_keeps_last_pages_reachable(self):
+        paginator = EstimatedPaginator(self.qs, 20, 5)
+        page = paginator.get_page(3)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+        self.assertTrue(paginator.get_page(2).has_next())
+
+    def test_high_estimate_adds_no_empty_pages(self):
+        page = EstimatedPaginator(self.qs, 20, 10 ** 6).get_page(2)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.next_page_number(), 3)
+        self.assertFalse(EstimatedPaginator(self.qs, 15, 10 ** 6).get_page(3).has_next())
+
+    def test_bad_page_number(self):
+        self.assertEqual(EstimatedPaginator(self.qs, 20, 0).get_page('x').number, 1)
+
+
+
+class DashboardEstimateTests(TransactionTestCase):
+    # Transactional: under ASGI the dashboard queries run on worker-thread connections
+    databases = '__all__'
+
+    def test_dashboard_pages_past_a_low_estimate(self):
+        self.client.force_login(make_requests())
+        with mock.patch.object(counts, 'ESTIMATE_THRESHOLD', 1), \
+                mock.patch.object(counts, 'estimated_table_rows', return_value=10):
+            response = self.client.get(reverse('transfer_app:dashboard'), {'page': 3, 'page_size': 20})
+        page = response.context['page_obj']
+        self.assertTrue(response.context['total_is_estimate'])
+        self.assertEqual((page.number, len(page), page.has_next()), (3, 5, False))
+
+    def test_estimate_reads_the_listing_database(self):
+        alias = list(connections)[-1]
+        with mock.patch.object(counts, 'ESTIMATE_THRESHOLD', 1), \
+                mock.patch.object(counts, 'estimated_table_rows', return_value=10) as estimate:
+            self.assertEqual(counts.dashboard_count(TransferRequest.objects.using(alias), {}), (10, True))
+        estimate.assert_called_once_with(TransferRequest, alias)
+
+
+
+class FullListArchiveTests(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = make_requests(0)
+        now = timezone.now()
+        cold = workflow.create_batch(self.user, None, 'Cold')
+        workflow.insert_requests(cold, [
+            TransferRequest(msnv=f'CO{i:03d}', effective_date=timezone.localdate(), requested_by=self.user)
+            for i in range(40)
+        ])
+        cold.requests.update(status='CONFIRMED')
+        hot = workflow.create_batch(self.user, None, 'Hot')
+        workflow.insert_requests(hot, [
+            TransferRequest(msnv=f'HO{i:03d}', effective_date=timezone.localdate(), requested_by=self.user)
+            for i in range(40)
+        ])
+        # Interleave the two batches by created_at
+        for i, tr in enumerate(TransferRequest.objects.order_by('id')):
+            TransferRequest.objects.filter(id=tr.id).update(created_at=now - timedelta(minutes=2 * (i % 40) + i // 40))
+        self.assertEqual(archive.archive_batches([cold.id], now + timedelta(days=1)), (1, 40))
+        self.expected = [
+            tr.id for tr in sorted(
+                list(TransferRequest.objects.all()) + list(archive.ArchivedTransferRequest.objects.all()),
+                key=lambda tr: (tr.created_at, tr.id), reverse=True,
+            )
+        ]
+        self.client.force_login(self.user)
+
+    def test_offset_pages_continue_into_archive(self):
+        url = reverse('transfer_app:my_requests_full')
+        first, second = self.client.get(url), self.client.get(url, {'page': 2})
+        self.assertEqual(first.context['page_obj'].paginator.count, 80)
+        ids = [r.id for r in first.context['page_obj'].object_list] + [r.id for r in second.context['page_obj'].object_list]
+        self.assertEqual(ids, self.expected)
+
+    def test_cursor_pages_continue_into_archive(self):
+        url = reverse('transfer_app:my_requests_full')
+        first = self.client.get(url, {'paging': 'cursor'}).context['page_obj']
+        second = self.client.get(url, {'paging': 'cursor', 'cursor': first.next_cursor}).context['page_obj']
+        self.assertFalse(second.next_cursor)
+        self.assertEqual([r.id for r in first] + [r.id for r in second], self.expected)
+
+    def test_archived_request_detail(self):
+        rid = archive.ArchivedTransferRequest.objects.values_list('id', flat=True).first()
+        response = self.client.get(reverse('transfer_app:view_request', args=[rid]))
+        self.assertContains(response, 'Đã lưu trữ')
+        self.assertContains(response, self.user.username)
@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import path, reverse
+from django.utils import timezone
+
+from transfer_app import async_views, push, views, workflow
+from transfer_app.models import TransferEvent, TransferRequest, UserProfile
+
+# Both notification views whatever TRANSFER_ASYNC_VIEWS says
+urlpatterns = [
+    path('sse/', async_views.notifications),
+    path('wsgi/', views.notifications),
+]
+
+
+class PushScriptTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='push-sv')
+        UserProfile.objects.create(user=cls.user, role='SUPERVISOR')
+
+    def page(self):
+        self.client.force_login(self.user)
+        return self.client.get(reverse('transfer_app:create_request'))
+
+    @override_settings(TRANSFER_ASYNC_VIEWS=False)
+    def test_no_event_source_under_wsgi(self):
+        self.assertNotContains(self.page(), 'new EventSource')
+
+    @override_settings(TRANSFER_ASYNC_VIEWS=True)
+    def test_event_source_with_async_views(self):
+        self.assertContains(self.page(), 'new EventSource')
+
+
+def make_user(username, role):
+    user = User.objects.create(username=username)
+    UserProfile.objects.create(user=user, role=role)
+    return user
+
+
+class NotificationGroupingTests(TestCase):
+    def test_events_are_grouped_per_batch_and_audience(self):
+        sv, lead = make_user('push-g-sv', 'SUPERVISOR'), make_user('push-g-lead', 'LEAD')
+        batch = workflow.create_batch(sv, lead, 'Grouping')
+        workflow.insert_requests(batch, [
+            TransferRequest(msnv=f'PG{i}', effective_date=timezone.localdate(), requested_by=sv) for i in range(3)
+        ])
+        r1, r2, r3 = batch.requests.order_by('id').values_list('id', flat=True)
+        created, transition = TransferEvent.KIND_CREATED, TransferEvent.KIND_TRANSITION
+        notes = push.notifications([
+            (1, created, r1, batch.id, 'PENDING'), (2, created, r2, batch.id, 'PENDING'),
+            (3, created, r3, batch.id, 'PENDING'), (4, transition, r1, batch.id, 'APPROVED'),
+            (5, transition, r2, batch.id, 'REJECTED'), (6, transition, r3, batch.id, 'CANCELED'),
+        ])
+        self.assertEqual(
+            [(event_id, kind, audience, payload['count']) for event_id, kind, audience, payload in notes],
+            [(3, 'batch_assigned', ('user', lead.id), 3), (4, 'ready_to_confirm', ('role', 'DATA_PROCESSOR'), 1),
+             (5, 'rejected', ('user', sv.id), 1)],
+        )
+        self.assertEqual(notes[0][3]['batch_number'], batch.batch_number)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class StreamTests(TransactionTestCase):
+    # Transactional: the hub reads events on its own worker-thread connection
+    databases = '__all__'
+
+    def setUp(self):
+        self.sv = make_user('push-s-sv', 'SUPERVISOR')
+        self.lead = make_user('push-s-lead', 'LEAD')
+        self.hub = push.Hub()
+        patcher = mock.patch.object(push, 'HUB', self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_batch(self, n=2):
+        with transaction.atomic():
+            batch = workflow.create_batch(self.sv, self.lead, 'Push')
+            workflow.insert_requests(batch, [
+                TransferRequest(msnv=f'PS{i}', effective_date=timezone.localdate(), requested_by=self.sv)
+                for i in range(n)
+            ])
+        return batch
+
+    async def read_stream(self, response):
+        """The whole body; streams end after MAX_STREAM_SECONDS."""
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        return b''.join(chunks).decode()
+
+    async def stop_hub(self):
+        # The poller would otherwise outlive the test's event loop
+        if self.hub.poller is not None:
+            self.hub.poller.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.hub.poller
+
+    @mock.patch.object(push, 'POLL_SECONDS', 30)
+    async def test_hub_delivers_published_events_to_their_audience(self):
+        lead_queue = await self.hub.subscribe(self.lead.id, 'LEAD')
+        dp_queue = await self.hub.subscribe(self.sv.id, 'DATA_PROCESSOR')
+        batch = await sync_to_async(self.make_batch)()
+        # The commit calls push.publish(): no need to wait for the 30s poll
+        event_id, kind, audience, payload = await asyncio.wait_for(lead_queue.get(), 2)
+        self.assertEqual((kind, audience, payload['batch_id'], payload['count']), ('batch_assigned', ('user', self.lead.id), batch.id, 2))
+        self.assertEqual(event_id, self.hub.cursor)
+        self.assertTrue(dp_queue.empty())
+        self.hub.deliver((event_id + 1, 'ready_to_confirm', ('role', 'DATA_PROCESSOR'), {}), only=lead_queue)
+        self.assertTrue(lead_queue.empty() and dp_queue.empty())
+        await self.stop_hub()
+
+    @mock.patch.object(push, 'HEARTBEAT_SECONDS', 0.1)
+    @mock.patch.object(push, 'MAX_STREAM_SECONDS', 0.35)
+    @mock.patch.object(push, 'POLL_SECONDS', 0.05)
+    async def test_heartbeat_until_max_duration(self):
+        await sync_to_async(self.async_client.force_login)(self.lead)
+        response = await self.async_client.get('/sse/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = await asyncio.wait_for(self.read_stream(response), 5)
+        self.assertTrue(body.startswith(f'retry: {push.RETRY_MS}\n\n'))
+        self.assertGreaterEqual(body.count(': ping\n\n'), 2)
+        self.assertNotIn('event:', body)
+        # The stream ended by itself and left the hub
+        self.assertEqual(self.hub.subscribers, {})
+        await self.stop_hub()
+
+    @mock.patch.object(push, 'MAX_STREAM_SECONDS', 0.2)
+    @mock.patch.object(push, 'POLL_SECONDS', 0.05)
+    async def test_last_event_id_replays_missed_events(self):
+        last_seen = await sync_to_async(lambda: TransferEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0)()
+        batch = await sync_to_async(self.make_batch)(3)
+        await sync_to_async(self.async_client.force_login)(self.lead)
+        response = await self.async_client.get('/sse/', headers={'Last-Event-ID': str(last_seen)})
+        body = await asyncio.wait_for(self.read_stream(response), 5)
+        self.assertIn('event: batch_assigned\n', body)
+        self.assertIn(f'"batch_id": {batch.id}, "batch_number": "{batch.batch_number}", "count": 3', body)
+        # Without the header the same events are history, not news
+        response = await self.async_client.get('/sse/')
+        self.assertNotIn('event:', await asyncio.wait_for(self.read_stream(response), 5))
+        await self.stop_hub()
+
+    async def test_anonymous_stream_is_refused(self):
+        response = await self.async_client.get('/sse/')
+        self.assertEqual(response.status_code, 204)
+
+    def test_wsgi_fallback_stops_event_source(self):
+        self.client.force_login(self.lead)
+        response = self.client.get('/wsgi/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
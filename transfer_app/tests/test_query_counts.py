@@ -0,0 +1,114 @@
+import re
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from transfer_app import perf, workflow
+from transfer_app.models import TransferRequest, UserProfile
+
+PROFILE_QUERY_RE = re.compile(r'FROM .transfer_app_userprofile.')
+# The ASGI stream authenticates the user; the WSGI 204 fallback reads nothing
+NOTIFICATION_QUERIES = 2 if settings.TRANSFER_ASYNC_VIEWS else 0
+
+
+def make_user(username, role):
+    user = User.objects.create_user(username=username, password='pw')
+    UserProfile.objects.create(user=user, role=role, msnv=username.upper())
+    return user
+
+
+# PerfMiddleware would start its own recorder for a sampled request
+@mock.patch.object(perf, 'SAMPLE_RATE', 0)
+class QueryCountTests(TransactionTestCase):
+    """Queries per request for every URL in transfer_app/urls.py.
+
+    Counted with perf.Recorder rather than the default connection alone, so
+    queries routed to the replica or run in the async views' worker threads
+    are included. Each count covers the whole middleware stack: the session
+    read and the user (joined to its profile) are the first two queries of
+    every authenticated request, and no view adds a UserProfile query.
+    """
+    databases = '__all__'
+
+    def setUp(self):
+        self.sv = make_user('qc-sv', 'SUPERVISOR')
+        self.lead = make_user('qc-lead', 'LEAD')
+        self.dp = make_user('qc-dp', 'DATA_PROCESSOR')
+        self.batch = workflow.create_batch(self.sv, self.lead, 'Query count')
+        workflow.insert_requests(self.batch, [
+            TransferRequest(msnv=f'QC{i:03d}', from_code='10001', to_code='10002',
+                            effective_date=timezone.localdate(), requested_by=self.sv)
+            for i in range(30)
+        ])
+        self.ids = list(self.batch.requests.order_by('id').values_list('id', flat=True))
+        self.approved, confirmed = TransferRequest.objects.filter(id__in=self.ids[-2:]).order_by('id')
+        for tr in (self.approved, confirmed):
+            workflow.transition(tr, 'approve', self.lead, 'LEAD')
+        workflow.transition(confirmed, 'confirm', self.dp, 'DATA_PROCESSOR')
+
+    def assertNumQueries(self, num, user, method, url, data=None):
+        """Django's assertNumQueries, counted across every alias and thread."""
+        if user is None:
+            self.client.logout()
+        else:
+            self.client.force_login(user)
+        token = perf.start()
+        try:
+            response = getattr(self.client, method)(url, data or {})
+            if response.streaming and not response.is_async:
+                b''.join(response.streaming_content)
+        finally:
+            recorder = perf.stop(token)
+        self.assertLess(response.status_code, 400, url)
+        self.assertEqual(recorder.queries, num, f'{method.upper()} {url}')
+        self.assertFalse([sql for sql in recorder.shapes if PROFILE_QUERY_RE.search(sql)], url)
+        return response
+
+    def test_public_pages(self):
+        self.assertNumQueries(0, None, 'get', reverse('transfer_app:index'))
+        self.assertNumQueries(0, None, 'get', reverse('transfer_app:login'))
+        self.assertNumQueries(0, None, 'get', reverse('transfer_app:register'))
+        self.assertNumQueries(2, self.sv, 'get', reverse('transfer_app:index'))
+        self.assertNumQueries(4, self.sv, 'get', reverse('transfer_app:logout'))
+
+    def test_list_pages(self):
+        for num, user, name in [(9, self.sv, 'dashboard'), (4, self.lead, 'inbox'), (NOTIFICATION_QUERIES, self.sv, 'notifications'),
+                                (6, self.sv, 'my_requests_full'), (6, self.lead, 'approved_by_me_full'),
+                                (6, self.dp, 'confirmed_by_me_full')]:
+            with self.subTest(name):
+                self.assertNumQueries(num, user, 'get', reverse(f'transfer_app:{name}'))
+
+    def test_request_pages(self):
+        self.assertNumQueries(6, self.sv, 'get', reverse('transfer_app:view_request', args=[self.ids[0]]))
+        self.assertNumQueries(4, self.sv, 'get', reverse('transfer_app:batch_requests', args=[self.batch.id]))
+        self.assertNumQueries(4, self.sv, 'get', reverse('transfer_app:export_requests'))
+        self.assertNumQueries(3, self.sv, 'get', reverse('transfer_app:create_request'))
+        self.assertNumQueries(3, self.sv, 'get', reverse('transfer_app:import_requests'))
+
+    def test_single_actions(self):
+        for num, user, name, rid, data in [
+            (14, self.lead, 'approve_request', self.ids[0], {}),
+            (19, self.lead, 'reject_request', self.ids[1], {'reason': 'Sai nhóm'}),
+            (14, self.dp, 'confirm_request', self.approved.id, {}),
+            (20, self.sv, 'cancel_request', self.ids[2], {}),
+        ]:
+            with self.subTest(name):
+                self.assertNumQueries(num, user, 'post', reverse(f'transfer_app:{name}', args=[rid]), data)
+
+    def test_bulk_action_and_result(self):
+        response = self.assertNumQueries(16, self.lead, 'post', reverse('transfer_app:bulk_action'), {
+            'action': 'approve', 'ids': self.ids[3:23],
+        })
+        result_url = next(iter(response.wsgi_request._messages)).message.split('href="')[1].split('"')[0]
+        self.assertNumQueries(4, self.lead, 'get', result_url)
+
+    def test_api(self):
+        self.assertNumQueries(4, self.sv, 'get', reverse('transfer_app:api_request_list'))
+        self.assertNumQueries(4, self.sv, 'get', reverse('transfer_app:api_request_detail', args=[self.ids[0]]))
+        self.assertNumQueries(5, self.sv, 'get', reverse('transfer_app:api_batch_list'))
+        self.assertNumQueries(6, self.sv, 'get', reverse('transfer_app:api_batch_detail', args=[self.batch.id]))
+        self.assertNumQueries(3, self.sv, 'get', reverse('transfer_app:api_event_feed'))
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from transfer_app import views
+from transfer_app.models import ArchivedTransferRequest, Batch, TransferRequest, UserProfile
+
+TABLE = TransferRequest._meta.db_table
+STATUSES = ['PENDING', 'APPROVED', 'CONFIRMED', 'REJECTED', 'CANCELED']
+
+
+class AccessPathPlanTests(TestCase):
+    """Each dashboard / "my list" query is served by its migration 0007 index, without a sort or a full scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {}
+        for role in ('SUPERVISOR', 'LEAD', 'DATA_PROCESSOR'):
+            for i in range(3):
+                user = User.objects.create(username=f'plan-{role.lower()}-{i}')
+                UserProfile.objects.create(user=user, role=role, msnv=f'{role[:2]}{i}')
+                cls.users.setdefault(role, []).append(user)
+        now = timezone.now()
+        batch = Batch.objects.create(batch_number='PLAN', created_by=cls.users['SUPERVISOR'][0])
+        TransferRequest.objects.bulk_create([
+            TransferRequest(
+                batch=batch, msnv=f'P{i:05d}', effective_date=now.date(), status=STATUSES[i % 5],
+                requested_by=cls.users['SUPERVISOR'][i % 3],
+                approved_by=cls.users['LEAD'][i % 3] if i % 5 in (1, 2) else None,
+                approved_at=now - timedelta(minutes=i) if i % 5 in (1, 2) else None,
+                confirmed_by=cls.users['DATA_PROCESSOR'][i % 3] if i % 5 == 2 else None,
+                confirmed_at=now - timedelta(minutes=i) if i % 5 == 2 else None,
+            )
+            for i in range(500)
+        ])
+
+    def assertUsesIndex(self, qs, index):
+        plan = qs.explain()
+        self.assertIn(index, plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+            self.assertNotRegex(plan, rf'SCAN {TABLE}(?! USING)')
+        elif connection.vendor == 'mysql':
+            self.assertNotIn('filesort', plan)
+            self.assertNotRegex(plan, rf'{TABLE} (?:\S+ )?ALL ')
+
+    def test_dashboard_unfiltered(self):
+        qs = views.dashboard_queryset(views.read_dashboard_filters({}))
+        self.assertUsesIndex(qs[:20], 'tr_created_idx')
+
+    def test_dashboard_status_filter(self):
+        qs = views.dashboard_queryset(views.read_dashboard_filters({'status': 'PENDING'}))
+        self.assertUsesIndex(qs[:20], 'tr_status_created_idx')
+
+    def test_my_requests_full(self):
+        qs = views.full_list_queryset(self.users['SUPERVISOR'][0], 'created')
+        self.assertUsesIndex(qs[:views.FULL_LIST_PAGE_SIZE], 'tr_reqby_created_idx')
+
+    def test_approved_by_me_full(self):
+        qs = views.full_list_queryset(self.users['LEAD'][0], 'approved')
+        self.assertUsesIndex(qs[:views.FULL_LIST_PAGE_SIZE], 'tr_apprby_approved_idx')
+
+    def test_confirmed_by_me_full(self):
+        qs = views.full_list_queryset(self.users['DATA_PROCESSOR'][0], 'confirmed')
+        self.assertUsesIndex(qs[:views.FULL_LIST_PAGE_SIZE], 'tr_confby_confirmed_idx')
+
+    def test_archived_full_lists(self):
+        for mode, role, index in [('created', 'SUPERVISOR', 'atr_reqby_created_idx'),
+                                  ('approved', 'LEAD', 'atr_apprby_approved_idx'),
+                                  ('confirmed', 'DATA_PROCESSOR', 'atr_confby_confirmed_idx')]:
+            with self.subTest(mode):
+                qs = views.full_list_queryset(self.users[role][0], mode, ArchivedTransferRequest)
+                self.assertIn(index, qs[:views.FULL_LIST_PAGE_SIZE].explain())
@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from transfer_app import search, views, workflow
+from transfer_app.models import TransferRequest
+
+
+class SearchFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='search-sv')
+        cls.batch = workflow.create_batch(user, None, 'Chuyển đổi ca làm việc')
+        search.index_batch(cls.batch)
+        other = workflow.create_batch(user, None, 'Tăng cường nhân lực')
+        search.index_batch(other)
+        today = timezone.localdate()
+        workflow.insert_requests(cls.batch, [
+            TransferRequest(msnv=msnv, effective_date=today, requested_by=user) for msnv in ('NV-001', 'NV001', '001-NV')
+        ])
+
+    def msnvs(self, **filters):
+        qs = views.filter_requests(TransferRequest.objects.all(), views.read_dashboard_filters(filters))
+        return sorted(qs.values_list('msnv', flat=True))
+
+    def test_accent_folded_words(self):
+        self.assertEqual(len(self.msnvs(desc='chuyen doi')), 3)
+        self.assertEqual(self.msnvs(desc='nhan luc'), [])
+
+    def test_plain_substring(self):
+        self.assertEqual(self.msnvs(msnv='nv00'), ['NV001'])
+        self.assertEqual(self.msnvs(msnv='001'), ['001-NV', 'NV-001', 'NV001'])
+
+    def test_punctuation_keeps_substring_meaning(self):
+        self.assertEqual(self.msnvs(msnv='NV-001'), ['NV-001'])
+        self.assertEqual(self.msnvs(msnv='v-0'), ['NV-001'])
+
+    def test_no_searchable_characters(self):
+        self.assertEqual(self.msnvs(msnv='---'), [])
+        self.assertEqual(self.msnvs(msnv='-'), ['001-NV', 'NV-001'])
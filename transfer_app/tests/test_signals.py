@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from transfer_app import counters, workflow
+from transfer_app.models import StatusCounter, TransferRequest, UserProfile
+
+
+class BatchDeleteTests(TestCase):
+    def test_detached_requests_leave_the_lead_inbox(self):
+        sv, lead = User.objects.create(username='sg-sv'), User.objects.create(username='sg-lead')
+        UserProfile.objects.create(user=sv, role='SUPERVISOR')
+        UserProfile.objects.create(user=lead, role='LEAD')
+        batch = workflow.create_batch(sv, lead, 'Signals')
+        workflow.insert_requests(batch, [
+            TransferRequest(msnv=f'SG{i}', effective_date=timezone.localdate(), requested_by=sv) for i in range(3)
+        ])
+        batch.delete()
+        self.assertFalse(TransferRequest.objects.filter(assignee=lead).exists())
+        self.assertEqual(TransferRequest.objects.filter(batch__isnull=True, status='PENDING').count(), 3)
+        self.assertEqual(counters.counts_for(StatusCounter.SCOPE_LEAD, [lead.id])[lead.id].get('PENDING', 0), 0)
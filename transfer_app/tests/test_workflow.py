@@ -0,0 +1,45 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from transfer_app import archive, workflow
+from transfer_app.models import Batch, TransferRequest, UserProfile, WorkflowActor
+
+
+class TransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sv, cls.lead, cls.other = [User.objects.create(username=name) for name in ('wf-sv', 'wf-lead', 'wf-other')]
+        UserProfile.objects.create(user=cls.sv, role='SUPERVISOR')
+        UserProfile.objects.create(user=cls.lead, role='LEAD')
+        UserProfile.objects.create(user=cls.other, role='LEAD')
+        cls.batch = workflow.create_batch(cls.sv, cls.lead, 'Workflow')
+        workflow.insert_requests(cls.batch, [
+            TransferRequest(msnv='WF001', effective_date=timezone.localdate(), requested_by=cls.sv)
+        ])
+
+    def test_approve_rechecks_designated_lead_under_lock(self):
+        tr = TransferRequest.objects.get(batch=self.batch)
+        # The batch is handed to another lead after the view loaded the request
+        Batch.objects.filter(id=self.batch.id).update(designated_lead=self.other)
+        self.assertFalse(workflow.transition(tr, 'approve', self.lead, 'LEAD'))
+        self.assertEqual(TransferRequest.objects.get(id=tr.id).status, 'PENDING')
+        self.assertTrue(workflow.transition(tr, 'approve', self.other, 'LEAD'))
+        self.assertEqual(TransferRequest.objects.get(id=tr.id).approved_by, self.other)
+
+    def test_role_is_rechecked(self):
+        tr = TransferRequest.objects.get(batch=self.batch)
+        self.assertFalse(workflow.transition(tr, 'approve', self.lead, 'SUPERVISOR'))
+        self.assertFalse(workflow.transition(tr, 'reject', self.lead, 'LEAD', ''))
+
+    def test_rebuild_actors_includes_archive(self):
+        tr = TransferRequest.objects.get(batch=self.batch)
+        self.assertTrue(workflow.transition(tr, 'approve', self.lead, 'LEAD'))
+        TransferRequest.objects.filter(id=tr.id).update(status='CONFIRMED')
+        self.assertEqual(archive.archive_batches([self.batch.id], timezone.now() + timedelta(days=1)), (1, 1))
+        call_command('rebuild_workflow_actors', stdout=StringIO())
+        self.assertEqual(WorkflowActor.usernames(WorkflowActor.ACTION_APPROVED), ['wf-lead'])
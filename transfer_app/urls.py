@@ -1,5 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, api
+
+if getattr(settings, 'TRANSFER_ASYNC_VIEWS', False):
+    from . import async_views as list_views
+else:
+    list_views = views
 
 app_name = 'transfer_app'
 
@@ -8,15 +14,26 @@ urlpatterns = [
     path('register/', views.register_view, name='register'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', list_views.dashboard, name='dashboard'),
+    path('inbox/', views.inbox, name='inbox'),
+    path('notifications/', list_views.notifications, name='notifications'),
     path('requests/bulk/', views.bulk_action, name='bulk_action'),
+    path('requests/bulk/<str:result_id>/', views.bulk_result, name='bulk_result'),
+    path('requests/export/', views.export_requests, name='export_requests'),
+    path('batch/<int:batch_id>/requests/', views.batch_requests, name='batch_requests'),
     path('request/create/', views.create_request, name='create_request'),
+    path('request/import/', views.import_requests, name='import_requests'),
     path('request/<int:request_id>/', views.view_request, name='view_request'),
     path('request/<int:request_id>/approve/', views.approve_request, name='approve_request'),
     path('request/<int:request_id>/reject/', views.reject_request, name='reject_request'),
     path('request/<int:request_id>/confirm/', views.confirm_request, name='confirm_request'),
     path('request/<int:request_id>/cancel/', views.cancel_request, name='cancel_request'),
-    path('my/requests/', views.my_requests_full, name='my_requests_full'),
-    path('my/approved/', views.approved_by_me_full, name='approved_by_me_full'),
-    path('my/confirmed/', views.confirmed_by_me_full, name='confirmed_by_me_full'),
+    path('my/requests/', list_views.my_requests_full, name='my_requests_full'),
+    path('my/approved/', list_views.approved_by_me_full, name='approved_by_me_full'),
+    path('my/confirmed/', list_views.confirmed_by_me_full, name='confirmed_by_me_full'),
+    path('api/v1/requests/', api.request_list, name='api_request_list'),
+    path('api/v1/requests/<int:request_id>/', api.request_detail, name='api_request_detail'),
+    path('api/v1/batches/', api.batch_list, name='api_batch_list'),
+    path('api/v1/batches/<int:batch_id>/', api.batch_detail, name='api_batch_detail'),
+    path('api/v1/events/', api.event_feed, name='api_event_feed'),
 ]
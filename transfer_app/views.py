@@ -2,14 +2,22 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.db import transaction
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.http import url_has_allowed_host_and_scheme
+from urllib.parse import urlencode
 import uuid
-from .models import UserProfile, Group, TransferRequest, Batch
+from .models import UserProfile, Group, TransferRequest, Batch, SearchTerm, WorkflowActor, StatusCounter
+from .pagination import KeysetPaginator, CountedPaginator, EstimatedPaginator
+from . import search, counts, counters, workflow, importer, exporter, fragments, rendering, archive
+from . import replicas, bulk_results
+from .replicas import read_replica
 
 
 def get_profile(user):
@@ -28,6 +36,67 @@ def role_required(*roles):
         return wrapper
     return decorator
 
+def use_cursor_paging(request):
+    return request.GET.get('paging') == 'cursor'
+
+
+def paginate_list(request, qs, key, per_page):
+    """Offset pagination by default, keyset pagination with ?paging=cursor."""
+    if use_cursor_paging(request):
+        return KeysetPaginator(qs, key, per_page).get_page(request.GET.get('cursor'))
+    page_num = int(request.GET.get('page', '1')) if request.GET.get('page', '1').isdigit() else 1
+    return Paginator(qs, per_page).get_page(page_num)
+
+
+def batch_status_counts(batch_ids):
+    """{batch_id: {'PENDING': n, ..., 'total': n}} read from the materialized counters."""
+    return counters.counts_for(StatusCounter.SCOPE_BATCH, batch_ids)
+
+
+DASHBOARD_FILTERS = ('desc', 'status', 'created_from', 'created_to', 'approved_by', 'confirmed_by', 'requested_by', 'msnv')
+
+
+def read_dashboard_filters(params):
+    return {name: params.get(name, '').strip() for name in DASHBOARD_FILTERS}
+
+
+def filter_requests(qs, filters):
+    """Apply the dashboard filters (see read_dashboard_filters) to `qs`."""
+    if filters.get('desc'):
+        qs = search.search_filter(qs, 'batch_id', SearchTerm.KIND_BATCH_DESC, filters['desc'], 'batch__description')
+    if filters.get('status'):
+        qs = qs.filter(status=filters['status'])
+    # Date range (created_at)
+    if filters.get('created_from'):
+        try:
+            qs = qs.filter(created_at__date__gte=filters['created_from'])
+        except Exception:
+            pass
+    if filters.get('created_to'):
+        try:
+            qs = qs.filter(created_at__date__lte=filters['created_to'])
+        except Exception:
+            pass
+    if filters.get('approved_by'):
+        qs = qs.filter(
+            Q(approved_by__username__icontains=filters['approved_by']) |
+            Q(approved_by__profile__msnv__icontains=filters['approved_by'])
+        )
+    if filters.get('confirmed_by'):
+        qs = qs.filter(
+            Q(confirmed_by__username__icontains=filters['confirmed_by']) |
+            Q(confirmed_by__profile__msnv__icontains=filters['confirmed_by'])
+        )
+    if filters.get('requested_by'):
+        qs = qs.filter(
+            Q(requested_by__username__icontains=filters['requested_by']) |
+            Q(requested_by__profile__msnv__icontains=filters['requested_by'])
+        )
+    if filters.get('msnv'):
+        qs = search.search_filter(qs, 'id', SearchTerm.KIND_MSNV, filters['msnv'], 'msnv')
+    return qs
+
+
 def api_debug(request):
     return HttpResponse('Running in pure Django mode (no external API).', content_type='text/plain')
 
@@ -81,19 +150,18 @@ def logout_view(request):
     return redirect('transfer_app:login')
 
 
-def dashboard(request):
-    if not request.user.is_authenticated:
-        return redirect('transfer_app:login')
+PAGE_SIZE_OPTIONS = [10, 20, 50, 100]
+STATUS_FILTER_CHOICES = [
+    ('PENDING', 'Chờ duyệt'),
+    ('APPROVED', 'Đã duyệt'),
+    ('CONFIRMED', 'Đã xác nhận'),
+    ('REJECTED', 'Từ chối'),
+    ('CANCELED', 'Hủy'),
+]
 
-    # --- Filters ---
-    desc_query = request.GET.get('desc', '').strip()
-    status_query = request.GET.get('status', '').strip()
-    created_from = request.GET.get('created_from', '').strip()
-    created_to = request.GET.get('created_to', '').strip()
-    approved_query = request.GET.get('approved_by', '').strip()
-    confirmed_query = request.GET.get('confirmed_by', '').strip()
-    requested_query = request.GET.get('requested_by', '').strip()
-    msnv_query = request.GET.get('msnv', '').strip()
+
+def read_dashboard_params(request):
+    """Filters and paging options of a dashboard request."""
     page = request.GET.get('page', '1')
     try:
         page_num = int(page)
@@ -102,193 +170,325 @@ def dashboard(request):
     page_size = request.GET.get('page_size', '20')
     try:
         page_size_num = int(page_size)
-        if page_size_num not in [10,20,50,100]:
+        if page_size_num not in PAGE_SIZE_OPTIONS:
             page_size_num = 20
     except ValueError:
         page_size_num = 20
+    batch_mode = request.GET.get('view') == 'batch'
+    return {
+        'filters': read_dashboard_filters(request.GET),
+        'page_num': page_num,
+        'page_size': page_size_num,
+        'batch_mode': batch_mode,
+        'cursor_mode': use_cursor_paging(request) and not batch_mode,
+        'cursor': request.GET.get('cursor'),
+    }
 
+
+def dashboard_queryset(filters):
     qs = TransferRequest.objects.select_related(
         'batch','to_group','from_group','requested_by','approved_by','confirmed_by'
     ).all().order_by('-created_at')
+    return filter_requests(qs, filters)
 
-    if desc_query:
-        qs = qs.filter(Q(batch__description__icontains=desc_query))
-    if status_query:
-        qs = qs.filter(status=status_query)
-    # Date range (created_at)
-    if created_from:
-        try:
-            qs = qs.filter(created_at__date__gte=created_from)
-        except Exception:
-            pass
-    if created_to:
-        try:
-            qs = qs.filter(created_at__date__lte=created_to)
-        except Exception:
-            pass
-    if approved_query:
-        qs = qs.filter(
-            Q(approved_by__username__icontains=approved_query) |
-            Q(approved_by__profile__msnv__icontains=approved_query)
-        )
-    if confirmed_query:
-        qs = qs.filter(
-            Q(confirmed_by__username__icontains=confirmed_query) |
-            Q(confirmed_by__profile__msnv__icontains=confirmed_query)
-        )
-    if requested_query:
-        qs = qs.filter(
-            Q(requested_by__username__icontains=requested_query) |
-            Q(requested_by__profile__msnv__icontains=requested_query)
-        )
-    if msnv_query:
-        qs = qs.filter(msnv__icontains=msnv_query)
 
-    total_rows = qs.count()
-    paginator = Paginator(qs, page_size_num)
-    page_obj = paginator.get_page(page_num)
+def dashboard_batches(qs, filters):
+    """Batches (phiếu) for the batch view; their requests are loaded per batch via batch_requests."""
+    batch_qs = Batch.objects.select_related('created_by', 'designated_lead').order_by('-created_at', '-id')
+    if any(filters.values()):
+        batch_qs = batch_qs.filter(id__in=qs.order_by().values('batch_id'))
+    return batch_qs
+
 
-    # Group only visible page requests
+def group_page(object_list, batch_mode):
+    """Return (batches, standalone) for the rows of the visible page only."""
     batches = {}
     standalone = []
-    for tr in page_obj.object_list:
-        if tr.batch:
-            if tr.batch.id not in batches:
-                batches[tr.batch.id] = {
-                    'batch': tr.batch,
-                    'requests': []
-                }
-            batches[tr.batch.id]['requests'].append(tr)
-        else:
-            standalone.append(tr)
+    if batch_mode:
+        status_counts = batch_status_counts([b.id for b in object_list])
+        for b in object_list:
+            batches[b.id] = {'batch': b, 'counts': status_counts[b.id], 'requests': []}
+    else:
+        for tr in object_list:
+            if tr.batch:
+                if tr.batch.id not in batches:
+                    batches[tr.batch.id] = {
+                        'batch': tr.batch,
+                        'requests': []
+                    }
+                batches[tr.batch.id]['requests'].append(tr)
+            else:
+                standalone.append(tr)
+    return list(batches.values()), standalone
 
-    # Role specific sections
-    profile = get_profile(request.user)
-    my_requests = approved_by_me = confirmed_by_me = []
+
+def role_sections(user):
+    """The 'my requests' / 'approved by me' / 'confirmed by me' side widgets."""
+    profile = get_profile(user)
+    sections = {'my_requests': [], 'approved_by_me': [], 'confirmed_by_me': [], 'my_pending': None}
     if profile:
         if profile.role == 'SUPERVISOR':
-            my_requests = TransferRequest.objects.filter(requested_by=request.user).order_by('-created_at')[:20]
+            sections['my_requests'] = list(TransferRequest.objects.filter(requested_by=user).order_by('-created_at')[:20])
+            sections['my_pending'] = counters.count(StatusCounter.SCOPE_REQUESTER, user.id, 'PENDING')
         elif profile.role == 'LEAD':
-            approved_by_me = TransferRequest.objects.filter(approved_by=request.user).order_by('-approved_at')[:20]
+            sections['approved_by_me'] = list(TransferRequest.objects.filter(approved_by=user).order_by('-approved_at')[:20])
+            sections['my_pending'] = counters.count(StatusCounter.SCOPE_LEAD, user.id, 'PENDING')
         elif profile.role == 'DATA_PROCESSOR':
-            confirmed_by_me = TransferRequest.objects.filter(confirmed_by=request.user).order_by('-confirmed_at')[:20]
-
-    status_choices = [
-        ('PENDING', 'Chờ duyệt'),
-        ('APPROVED', 'Đã duyệt'),
-        ('CONFIRMED', 'Đã xác nhận'),
-        ('REJECTED', 'Từ chối'),
-        ('CANCELED', 'Hủy'),
-    ]
-    page_size_options = [10, 20, 50, 100]
-
-    # Distinct usernames for approved/confirmed filters (for select options)
-    approved_usernames = list(
-        TransferRequest.objects.filter(approved_by__isnull=False)
-        .order_by('approved_by__username')
-        .values_list('approved_by__username', flat=True)
-        .distinct()
-    )
-    confirmed_usernames = list(
-        TransferRequest.objects.filter(confirmed_by__isnull=False)
-        .order_by('confirmed_by__username')
-        .values_list('confirmed_by__username', flat=True)
-        .distinct()
-    )
-    
+            sections['confirmed_by_me'] = list(TransferRequest.objects.filter(confirmed_by=user).order_by('-confirmed_at')[:20])
+    return sections
+
+
+def filter_options():
+    # Distinct usernames for approved/confirmed filters (for select options),
+    # read from the maintained directory instead of scanning TransferRequest
+    return {
+        'approved_usernames': WorkflowActor.usernames(WorkflowActor.ACTION_APPROVED),
+        'confirmed_usernames': WorkflowActor.usernames(WorkflowActor.ACTION_CONFIRMED),
+    }
+
+
+def dashboard_context(request, params, page_obj, paginator, total_rows, total_is_estimate, sections, options):
+    filters = params['filters']
+    batches, standalone = group_page(page_obj.object_list, params['batch_mode'])
+    now = rendering.render_now(request)
+    rendering.decorate_batches(batches, now)
+    rendering.decorate_requests(standalone, now)
+    for name, time_field in [('my_requests', 'created_at'), ('approved_by_me', 'approved_at'),
+                             ('confirmed_by_me', 'confirmed_at')]:
+        rendering.decorate_requests(sections[name], now, time_field)
+    profile = get_profile(request.user)
+    fragments.annotate_blocks(batches, profile.role if profile else '', params['batch_mode'], filters['status'])
+    filter_querystring = urlencode([(k, v) for k, v in [
+        ('page_size', params['page_size']), ('desc', filters['desc']), ('msnv', filters['msnv']),
+        ('status', filters['status']), ('created_from', filters['created_from']),
+        ('created_to', filters['created_to']), ('approved_by', filters['approved_by']),
+        ('confirmed_by', filters['confirmed_by']), ('requested_by', filters['requested_by']),
+    ] if v])
     context = {
-        'batches': list(batches.values()),
+        'batches': batches,
         'standalone': standalone,
         'user': request.user,
         'page_obj': page_obj,
-        'page_size': page_size_num,
+        'page_size': params['page_size'],
         'total_rows': total_rows,
-        'desc_query': desc_query,
-        'status_query': status_query,
-        'created_from': created_from,
-        'created_to': created_to,
-        'approved_query': approved_query,
-        'confirmed_query': confirmed_query,
-        'requested_query': requested_query,
-        'msnv_query': msnv_query,
-        'my_requests': my_requests,
-        'approved_by_me': approved_by_me,
-        'confirmed_by_me': confirmed_by_me,
+        'total_is_estimate': total_is_estimate,
+        'desc_query': filters['desc'],
+        'status_query': filters['status'],
+        'created_from': filters['created_from'],
+        'created_to': filters['created_to'],
+        'approved_query': filters['approved_by'],
+        'confirmed_query': filters['confirmed_by'],
+        'requested_query': filters['requested_by'],
+        'msnv_query': filters['msnv'],
         'paginator': paginator,
-        'status_choices': status_choices,
-        'page_size_options': page_size_options,
-        'approved_usernames': approved_usernames,
-        'confirmed_usernames': confirmed_usernames,
+        'status_choices': STATUS_FILTER_CHOICES,
+        'page_size_options': PAGE_SIZE_OPTIONS,
+        'cursor_mode': params['cursor_mode'],
+        'batch_mode': params['batch_mode'],
+        'filter_querystring': filter_querystring,
+        'fragment_ttl': fragments.FRAGMENT_CACHE_TTL,
     }
+    context.update(sections)
+    context.update(options)
+    return context
+
+
+@read_replica
+def dashboard(request):
+    if not request.user.is_authenticated:
+        return redirect('transfer_app:login')
+
+    params = read_dashboard_params(request)
+    filters = params['filters']
+    qs = dashboard_queryset(filters)
+
+    total_is_estimate = False
+    if params['batch_mode']:
+        paginator = Paginator(dashboard_batches(qs, filters), params['page_size'])
+        page_obj = paginator.get_page(params['page_num'])
+        total_rows = paginator.count
+    elif params['cursor_mode']:
+        # Keyset mode: no COUNT(*), no OFFSET; page N costs the same as page 1
+        total_rows = None
+        paginator = None
+        page_obj = KeysetPaginator(qs, 'created_at', params['page_size']).get_page(params['cursor'])
+    else:
+        # One cached count shared with the paginator; an estimate is only shown
+        total_rows, total_is_estimate = counts.dashboard_count(qs, filters)
+        if total_is_estimate:
+            paginator = EstimatedPaginator(qs, params['page_size'], total_rows)
+        else:
+            paginator = CountedPaginator(qs, params['page_size'], total_rows)
+        page_obj = paginator.get_page(params['page_num'])
+
+    context = dashboard_context(
+        request, params, page_obj, paginator, total_rows, total_is_estimate,
+        role_sections(request.user), filter_options(),
+    )
     return render(request, 'transfer_app/dashboard.html', context)
 
 
 @login_required
-def my_requests_full(request):
-    profile = get_profile(request.user)
-    if not profile or profile.role != 'SUPERVISOR':
-        messages.error(request, 'Chỉ Supervisor mới xem toàn bộ yêu cầu đã tạo')
-        return redirect('transfer_app:dashboard')
-    qs = TransferRequest.objects.filter(requested_by=request.user).order_by('-created_at')
-    page_num = int(request.GET.get('page', '1')) if request.GET.get('page', '1').isdigit() else 1
-    paginator = Paginator(qs, 50)
-    page_obj = paginator.get_page(page_num)
-    return render(request, 'transfer_app/list_full.html', {
-        'title': 'Yêu cầu của tôi',
-        'mode': 'created',
+@read_replica
+def export_requests(request):
+    """Stream the dashboard's filtered rows as CSV (default) or JSONL."""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exporter.FORMATS:
+        fmt = 'csv'
+    filters = read_dashboard_filters(request.GET)
+    # Rows are read while the response streams, after read_replica has returned
+    querysets = [
+        filter_requests(model.objects.using(replicas.current_alias()), filters) for model in archive.REQUEST_MODELS
+    ]
+    _, content_type = exporter.FORMATS[fmt]
+    response = StreamingHttpResponse(exporter.export_lines(querysets, fmt), content_type=content_type)
+    filename = f"transfer_requests_{timezone.localtime():%Y%m%d_%H%M}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def batch_requests(request, batch_id):
+    """Chunk of one batch's requests (HTML fragment), keyed by ?after=<last id>."""
+    batch = get_object_or_404(Batch, id=batch_id)
+    try:
+        after = int(request.GET.get('after', '0'))
+        limit = min(max(int(request.GET.get('limit', '100')), 1), 500)
+    except ValueError:
+        after, limit = 0, 100
+    qs = TransferRequest.objects.select_related(
+        'requested_by', 'approved_by', 'confirmed_by'
+    ).filter(batch=batch, id__gt=after).order_by('id')
+    status_query = request.GET.get('status', '').strip()
+    if status_query:
+        qs = qs.filter(status=status_query)
+    rows = list(qs[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rendering.decorate_requests(rows[:limit], rendering.render_now(request))
+    return render(request, 'transfer_app/_batch_requests.html', {
+        'batch': batch,
+        'requests': rows,
+        'has_more': has_more,
+        'next_after': rows[-1].id if rows else after,
+        'limit': limit,
+        'status_query': status_query,
+    })
+
+
+# mode: (role, owner field, ordering key, title, permission message)
+FULL_LISTS = {
+    'created': ('SUPERVISOR', 'requested_by', 'created_at', 'Yêu cầu của tôi',
+                'Chỉ Supervisor mới xem toàn bộ yêu cầu đã tạo'),
+    'approved': ('LEAD', 'approved_by', 'approved_at', 'Tôi đã duyệt',
+                 'Chỉ Lead mới xem toàn bộ yêu cầu đã duyệt'),
+    'confirmed': ('DATA_PROCESSOR', 'confirmed_by', 'confirmed_at', 'Tôi đã xác nhận',
+                  'Chỉ Data Processor mới xem toàn bộ yêu cầu đã xác nhận'),
+}
+FULL_LIST_PAGE_SIZE = 50
+
+
+def full_list_queryset(user, mode, model=TransferRequest):
+    _, owner, key, _, _ = FULL_LISTS[mode]
+    return model.objects.filter(**{owner: user}).order_by(f'-{key}')
+
+
+def full_list_rows(user, mode):
+    """The full list over the hot table and the archive."""
+    return archive.HotAndCold(*(full_list_queryset(user, mode, model) for model in archive.REQUEST_MODELS))
+
+
+def full_list_context(request, mode, page_obj):
+    page_obj.object_list = rendering.decorate_requests(
+        list(page_obj.object_list), rendering.render_now(request), FULL_LISTS[mode][2]
+    )
+    return {
+        'title': FULL_LISTS[mode][3],
+        'mode': mode,
         'page_obj': page_obj,
+        'cursor_mode': use_cursor_paging(request),
         'user': request.user,
-    })
+    }
 
 
-@login_required
-def approved_by_me_full(request):
+def full_list(request, mode):
+    role, _, key, _, denied = FULL_LISTS[mode]
     profile = get_profile(request.user)
-    if not profile or profile.role != 'LEAD':
-        messages.error(request, 'Chỉ Lead mới xem toàn bộ yêu cầu đã duyệt')
+    if not profile or profile.role != role:
+        messages.error(request, denied)
         return redirect('transfer_app:dashboard')
-    qs = TransferRequest.objects.filter(approved_by=request.user).order_by('-approved_at')
-    page_num = int(request.GET.get('page', '1')) if request.GET.get('page', '1').isdigit() else 1
-    paginator = Paginator(qs, 50)
-    page_obj = paginator.get_page(page_num)
-    return render(request, 'transfer_app/list_full.html', {
-        'title': 'Tôi đã duyệt',
-        'mode': 'approved',
-        'page_obj': page_obj,
-        'user': request.user,
-    })
+    page_obj = paginate_list(request, full_list_rows(request.user, mode), key, FULL_LIST_PAGE_SIZE)
+    return render(request, 'transfer_app/list_full.html', full_list_context(request, mode, page_obj))
 
 
 @login_required
+@read_replica
+def my_requests_full(request):
+    return full_list(request, 'created')
+
+
+@login_required
+@read_replica
+def approved_by_me_full(request):
+    return full_list(request, 'approved')
+
+
+@login_required
+@read_replica
 def confirmed_by_me_full(request):
-    profile = get_profile(request.user)
-    if not profile or profile.role != 'DATA_PROCESSOR':
-        messages.error(request, 'Chỉ Data Processor mới xem toàn bộ yêu cầu đã xác nhận')
-        return redirect('transfer_app:dashboard')
-    qs = TransferRequest.objects.filter(confirmed_by=request.user).order_by('-confirmed_at')
-    page_num = int(request.GET.get('page', '1')) if request.GET.get('page', '1').isdigit() else 1
-    paginator = Paginator(qs, 50)
-    page_obj = paginator.get_page(page_num)
-    return render(request, 'transfer_app/list_full.html', {
-        'title': 'Tôi đã xác nhận',
-        'mode': 'confirmed',
+    return full_list(request, 'confirmed')
+
+
+def notifications(request):
+    # Push streams need the ASGI app (async_views.notifications); under WSGI
+    # a 204 tells EventSource to stop reconnecting.
+    return HttpResponse(status=204)
+
+
+INBOX_PAGE_SIZE = 50
+
+
+def inbox_queryset(user, role):
+    """Requests waiting on `user`: PENDING ones assigned to a lead, every APPROVED one for data processors."""
+    qs = TransferRequest.objects.select_related('batch', 'requested_by')
+    if role == 'LEAD':
+        return qs.filter(assignee=user)
+    return qs.filter(status='APPROVED')
+
+
+@role_required('LEAD', 'DATA_PROCESSOR')
+def inbox(request):
+    role = get_profile(request.user).role
+    qs = inbox_queryset(request.user, role)
+    page_obj = KeysetPaginator(qs, 'created_at', INBOX_PAGE_SIZE).get_page(request.GET.get('cursor'))
+    rendering.decorate_requests(page_obj.object_list, rendering.render_now(request))
+    if role == 'LEAD':
+        total, total_is_estimate = counters.count(StatusCounter.SCOPE_LEAD, request.user.id, 'PENDING'), False
+    else:
+        total, total_is_estimate = counts.dashboard_count(qs, {'status': 'APPROVED'})
+    return render(request, 'transfer_app/inbox.html', {
+        'title': 'Chờ tôi duyệt' if role == 'LEAD' else 'Chờ xác nhận',
+        'role': role,
         'page_obj': page_obj,
+        'total': total,
+        'total_is_estimate': total_is_estimate,
         'user': request.user,
     })
 
 
+@read_replica
 def view_request(request, request_id):
     if not request.user.is_authenticated:
         return redirect('transfer_app:login')
-    transfer = get_object_or_404(
-        TransferRequest.objects.select_related(
-            'from_group', 'to_group', 'requested_by', 'approved_by', 'confirmed_by'
-        ),
-        id=request_id
+    transfer = archive.find_request(
+        request_id, ('from_group', 'to_group', 'requested_by', 'approved_by', 'confirmed_by')
     )
+    if transfer is None:
+        raise Http404('Không tìm thấy yêu cầu')
     return render(request, 'transfer_app/view_request.html', {
         'user': request.user,
-        'request_data': transfer
+        'request_data': transfer,
+        'archived': not isinstance(transfer, TransferRequest),
+        'now': rendering.render_now(request),
     })
 
 
@@ -322,30 +522,21 @@ def create_request(request):
                 with transaction.atomic():
                     # Validate designated lead
                     try:
-                        designated_lead = User.objects.get(id=designated_lead_id)
+                        designated_lead = User.objects.select_related('profile').get(id=designated_lead_id)
                         lead_profile = get_profile(designated_lead)
                         if not lead_profile or lead_profile.role != 'LEAD':
                             messages.error(request, 'Người duyệt phải là tài khoản LEAD hợp lệ')
                             raise ValueError('Invalid lead')
                     except Exception:
                         raise ValueError('Lead không tồn tại')
-                    # Always create a batch (phiếu) even for single MSNV
-                    last_batch = Batch.objects.order_by('-id').first()
-                    next_id = (last_batch.id + 1) if last_batch else 1
-                    batch_number = f"PH{next_id:05d}"
+                    # Always create a batch (phiếu) even for single MSNV; its number
+                    # comes from its own id, so concurrent creators never collide
                     auto_desc = f"Chuyển {len(msnv_list)} MSNV từ {from_code} sang {to_code}"
-                    batch = Batch.objects.create(
-                        batch_number=batch_number,
-                        description=batch_desc or auto_desc,
-                        created_by=request.user,
-                        designated_lead=designated_lead
-                    )
-                    
-                    # Create requests for each MSNV
-                    requests_created = []
-                    for msnv in msnv_list:
-                        tr = TransferRequest.objects.create(
-                            batch=batch,
+                    batch = workflow.create_batch(request.user, designated_lead, batch_desc or auto_desc)
+
+                    # Create requests for each MSNV in bulk
+                    requests_created = [
+                        TransferRequest(
                             msnv=msnv,
                             from_code=from_code,
                             to_code=to_code,
@@ -353,8 +544,10 @@ def create_request(request):
                             is_permanent=is_permanent,
                             requested_by=request.user
                         )
-                        requests_created.append(tr)
-                    
+                        for msnv in msnv_list
+                    ]
+                    workflow.insert_requests(batch, requests_created)
+
                     messages.success(request, f'Đã tạo phiếu {batch.batch_number} với {len(requests_created)} yêu cầu. Lead duyệt: {designated_lead.username}')
                     return redirect('transfer_app:dashboard')
             except Exception as e:
@@ -364,22 +557,58 @@ def create_request(request):
     return render(request, 'transfer_app/create_request.html', {'user': request.user, 'leads': leads})
 
 
+@role_required('SUPERVISOR')
+def import_requests(request):
+    result = None
+    row_errors = []
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        batch_desc = request.POST.get('batch_description', '').strip()
+        designated_lead = User.objects.select_related('profile').filter(
+            id=request.POST.get('designated_lead') or 0, profile__role='LEAD'
+        ).first()
+        if not upload:
+            messages.error(request, 'Vui lòng chọn tệp CSV/XLSX')
+        elif not designated_lead:
+            messages.error(request, 'Người duyệt phải là tài khoản LEAD hợp lệ')
+        else:
+            def keep_error(error):
+                # Only the head of the report is rendered; the total is counted
+                if len(row_errors) < 200:
+                    row_errors.append(error)
+            try:
+                rows = importer.iter_rows(upload.file, upload.name)
+                result = importer.import_rows(
+                    rows, request.user, designated_lead,
+                    batch_desc or f"Nhập từ tệp {upload.name}", on_error=keep_error,
+                )
+            except importer.READ_ERRORS as e:
+                # import_rows() has rolled back anything it inserted
+                messages.error(request, f'Lỗi đọc tệp, chưa nhập dòng nào: {e}')
+    leads = User.objects.filter(profile__role='LEAD').order_by('username')
+    return render(request, 'transfer_app/import_requests.html', {
+        'user': request.user,
+        'leads': leads,
+        'result': result,
+        'row_errors': row_errors,
+    })
+
+
 @role_required('LEAD')
 def approve_request(request, request_id):
     if request.method != 'POST':
         return redirect('transfer_app:view_request', request_id=request_id)
     tr = get_object_or_404(TransferRequest, id=request_id)
-    # Restrict to designated lead if set
-    if tr.batch and tr.batch.designated_lead and tr.batch.designated_lead != request.user:
+    # Restrict to designated lead if set (a PENDING request carries it as its assignee);
+    # transition() checks the batch's designated lead again under the row lock
+    if tr.assignee_id and tr.assignee_id != request.user.id:
         messages.error(request, 'Bạn không phải Lead được chỉ định cho phiếu này')
     elif tr.status != 'PENDING':
         messages.error(request, f'Request is already {tr.status.lower()}')
-    else:
-        tr.approved_by = request.user
-        tr.approved_at = timezone.now()
-        tr.status = 'APPROVED'
-        tr.save()
+    elif workflow.transition(tr, 'approve', request.user, 'LEAD'):
         messages.success(request, f'Request #{request_id} approved successfully')
+    else:
+        messages.error(request, f'Yêu cầu #{request_id} vừa được người khác cập nhật, vui lòng thử lại')
     return redirect('transfer_app:view_request', request_id=request_id)
 
 
@@ -390,12 +619,10 @@ def confirm_request(request, request_id):
     tr = get_object_or_404(TransferRequest, id=request_id)
     if tr.status != 'APPROVED':
         messages.error(request, 'Only approved requests can be confirmed')
-    else:
-        tr.confirmed_by = request.user
-        tr.confirmed_at = timezone.now()
-        tr.status = 'CONFIRMED'
-        tr.save()
+    elif workflow.transition(tr, 'confirm', request.user, 'DATA_PROCESSOR'):
         messages.success(request, f'Request #{request_id} confirmed and completed')
+    else:
+        messages.error(request, f'Yêu cầu #{request_id} vừa được người khác cập nhật, vui lòng thử lại')
     return redirect('transfer_app:view_request', request_id=request_id)
 
 
@@ -422,13 +649,10 @@ def reject_request(request, request_id):
     
     if tr.status in ['CONFIRMED', 'REJECTED', 'CANCELED']:
         messages.error(request, f'Request is already {tr.status.lower()}')
-    else:
-        tr.status = 'REJECTED'
-        tr.rejection_reason = reason
-        tr.rejected_by = request.user
-        tr.rejected_at = timezone.now()
-        tr.save()
+    elif workflow.transition(tr, 'reject', request.user, profile.role, reason):
         messages.success(request, f'Request #{request_id} rejected')
+    else:
+        messages.error(request, f'Yêu cầu #{request_id} vừa được người khác cập nhật, vui lòng thử lại')
     return redirect('transfer_app:view_request', request_id=request_id)
 
 @role_required('SUPERVISOR')
@@ -440,129 +664,83 @@ def cancel_request(request, request_id):
         messages.error(request, 'Chỉ người tạo mới được hủy phiếu này')
     elif tr.status != 'PENDING':
         messages.error(request, 'Chỉ hủy được yêu cầu đang chờ duyệt')
-    else:
-        tr.status = 'CANCELED'
-        tr.canceled_by = request.user
-        tr.canceled_at = timezone.now()
-        tr.save()
+    elif workflow.transition(tr, 'cancel', request.user, 'SUPERVISOR'):
         messages.success(request, f'Đã hủy yêu cầu #{request_id}')
+    else:
+        messages.error(request, f'Yêu cầu #{request_id} vừa được người khác cập nhật, vui lòng thử lại')
     return redirect('transfer_app:view_request', request_id=request_id)
 
 
+def redirect_back(request):
+    """Redirect to the posted `next` URL (same host only), else to the dashboard."""
+    next_url = request.POST.get('next', '')
+    if next_url and url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+    ):
+        return redirect(next_url)
+    return redirect('transfer_app:dashboard')
+
+
+BULK_ACTION_LABELS = {'approve': 'Duyệt', 'confirm': 'Xác nhận', 'reject': 'Từ chối', 'cancel': 'Hủy'}
+BULK_RESULT_PAGE_SIZE = 100
+
+
 @login_required
 def bulk_action(request):
     if request.method != 'POST':
-        return redirect('transfer_app:dashboard')
+        return redirect_back(request)
     action = request.POST.get('action')
     ids = request.POST.getlist('ids')
     reason = request.POST.get('reason', '').strip()
     if not ids:
         messages.error(request, 'Không có yêu cầu nào được chọn')
-        return redirect('transfer_app:dashboard')
-    profile = get_profile(request.user)
-    success = 0
-    skipped = 0
-    skip_reasons = []
-    success_reasons = []
-    with transaction.atomic():
-        for rid in ids:
-            try:
-                tr = TransferRequest.objects.select_for_update().get(id=rid)
-            except TransferRequest.DoesNotExist:
-                skipped += 1
-                skip_reasons.append(f'Yêu cầu #{rid}: Không tồn tại')
-                continue
-            
-            if action == 'approve':
-                if profile.role != 'LEAD':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Chỉ Lead mới được duyệt')
-                elif tr.batch and tr.batch.designated_lead and tr.batch.designated_lead != request.user:
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id}: Lead không được chỉ định (phiếu yêu cầu: {tr.batch.designated_lead.username})')
-                elif tr.status != 'PENDING':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Trạng thái không phải "Chờ duyệt" (hiện tại: {tr.get_status_display()})')
-                else:
-                    tr.approved_by = request.user
-                    tr.approved_at = timezone.now()
-                    tr.status = 'APPROVED'
-                    tr.save()
-                    success += 1
-                    success_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Đã duyệt thành công')
-            elif action == 'confirm':
-                if profile.role != 'DATA_PROCESSOR':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Chỉ Data Processor mới được xác nhận')
-                elif tr.status != 'APPROVED':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Chỉ xác nhận được yêu cầu đã duyệt (hiện tại: {tr.get_status_display()})')
-                else:
-                    tr.confirmed_by = request.user
-                    tr.confirmed_at = timezone.now()
-                    tr.status = 'CONFIRMED'
-                    tr.save()
-                    success += 1
-                    success_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Đã xác nhận thành công')
-            elif action == 'reject':
-                # DATA_PROCESSOR can only reject APPROVED, LEAD can only reject PENDING
-                if profile.role == 'DATA_PROCESSOR' and tr.status != 'APPROVED':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Data Processor chỉ từ chối được yêu cầu đã duyệt (hiện tại: {tr.get_status_display()})')
-                elif profile.role == 'LEAD' and tr.status != 'PENDING':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Lead chỉ từ chối được yêu cầu chờ duyệt (hiện tại: {tr.get_status_display()})')
-                elif profile.role not in ['LEAD', 'DATA_PROCESSOR']:
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Không có quyền từ chối')
-                elif tr.status in ['CONFIRMED', 'REJECTED', 'CANCELED']:
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Đã hoàn tất hoặc từ chối/hủy rồi')
-                elif not reason:
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Thiếu lý do từ chối')
-                else:
-                    tr.status = 'REJECTED'
-                    tr.rejection_reason = reason
-                    tr.rejected_by = request.user
-                    tr.rejected_at = timezone.now()
-                    tr.save()
-                    success += 1
-                    success_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Đã từ chối - {reason}')
-            elif action == 'cancel':
-                if profile.role != 'SUPERVISOR':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Chỉ Supervisor mới được hủy')
-                elif tr.requested_by != request.user:
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id}: Không phải người tạo phiếu nên không thể hủy')
-                elif tr.status != 'PENDING':
-                    skipped += 1
-                    skip_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Chỉ hủy được yêu cầu chờ duyệt (hiện tại: {tr.get_status_display()})')
-                else:
-                    tr.status = 'CANCELED'
-                    tr.canceled_by = request.user
-                    tr.canceled_at = timezone.now()
-                    tr.save()
-                    success += 1
-                    success_reasons.append(f'Yêu cầu #{tr.id} (MSNV: {tr.msnv}): Đã hủy thành công')
-            else:
-                messages.error(request, 'Hành động không hợp lệ')
-                return redirect('transfer_app:dashboard')
-    
+        return redirect_back(request)
+    if action not in workflow.ACTIONS:
+        messages.error(request, 'Hành động không hợp lệ')
+        return redirect_back(request)
     if action == 'reject' and not reason:
         messages.error(request, 'Lý do từ chối bắt buộc')
+        return redirect_back(request)
+    profile = get_profile(request.user)
+    result = workflow.bulk_transition(request.user, profile.role if profile else None, action, ids, reason)
+    # One message, whatever the selection size; the details live on the result page
+    result_id = bulk_results.save(request.user.id, result)
+    text = f'{BULK_ACTION_LABELS[action]}: {result.succeeded} yêu cầu thành công'
+    if result.skipped:
+        text += f', {result.skipped} yêu cầu bị bỏ qua'
+    message = format_html(
+        '{}. <a href="{}" class="alert-link">Xem chi tiết</a>',
+        text, reverse('transfer_app:bulk_result', args=[result_id]),
+    )
+    if result.skipped:
+        messages.warning(request, message)
     else:
-        if success:
-            messages.success(request, f'✓ {success} yêu cầu xử lý thành công:')
-            for success_msg in success_reasons[:10]:  # Show first 10 success details
-                messages.success(request, success_msg)
-            if len(success_reasons) > 10:
-                messages.success(request, f'... và {len(success_reasons) - 10} yêu cầu khác')
-        if skipped:
-            messages.warning(request, f'⚠ {skipped} yêu cầu bị bỏ qua:')
-            for skip_msg in skip_reasons[:10]:  # Show first 10 reasons
-                messages.info(request, skip_msg)
-            if len(skip_reasons) > 10:
-                messages.info(request, f'... và {len(skip_reasons) - 10} lý do khác')
-    return redirect('transfer_app:dashboard')
+        messages.success(request, message)
+    return redirect_back(request)
+
+
+@login_required
+def bulk_result(request, result_id):
+    result = bulk_results.load(request.user.id, result_id)
+    if result is None:
+        messages.warning(request, 'Kết quả xử lý hàng loạt đã hết hạn')
+        return redirect('transfer_app:dashboard')
+    code = request.GET.get('code', '')
+    if code not in result.groups:
+        code = ''
+    page_obj = Paginator(result.rows(code or None), BULK_RESULT_PAGE_SIZE).get_page(request.GET.get('page'))
+    found = TransferRequest.objects.select_related('batch').in_bulk(
+        [rid for _, rid in page_obj.object_list if isinstance(rid, int)]
+    )
+    page_obj.object_list = [
+        {'id': rid, 'label': workflow.OUTCOME_LABELS[c], 'ok': c in workflow.SUCCESS_CODES, 'request': found.get(rid)}
+        for c, rid in page_obj.object_list
+    ]
+    return render(request, 'transfer_app/bulk_result.html', {
+        'title': f'Kết quả: {BULK_ACTION_LABELS[result.action]}',
+        'result': result,
+        'summary': result.summary(),
+        'code': code,
+        'page_obj': page_obj,
+        'user': request.user,
+    })
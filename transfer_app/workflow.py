@@ -0,0 +1,317 @@
+"""Set-based batch creation and bulk workflow transitions.
+
+create_batch() numbers a batch from its own primary key (no lock, no
+"last batch + 1" race); insert_rows() adds its requests with one executemany()
+per chunk and publish_batch() writes their counters and events set-based.
+
+bulk_transition() locks all selected rows with one SELECT ... FOR UPDATE,
+checks the role/status/designated-lead rules in memory and applies every
+allowed transition with one conditional UPDATE, instead of a
+get()/lazy-load/save() round-trip per row. Its BulkResult keeps only the
+request ids grouped by outcome code, so it stays small for any selection.
+transition() is the single-row path used by the approve/confirm/reject/cancel
+views; both finish with after_transition(), which keeps the derived data
+(status counters, cached counts, fragment versions, actor directory) in step
+and appends the TransferEvents of the change feed.
+"""
+import uuid
+
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import counters, counts, events, fragments, search
+from .models import Batch, TransferRequest, WorkflowActor, SearchTerm
+
+CHUNK_SIZE = 1000
+# Keys of a row for insert_rows(), and the columns it writes
+ROW_FIELDS = ('msnv', 'from_code', 'to_code', 'effective_date', 'is_permanent', 'status', 'requested_by_id')
+INSERT_COLUMNS = ('batch_id', 'msnv', 'from_code', 'to_code', 'effective_date', 'is_permanent', 'status',
+                  'requested_by_id', 'assignee_id', 'created_at', 'updated_at')
+ACTIONS = ('approve', 'confirm', 'reject', 'cancel')
+STATUS_LABELS = dict(TransferRequest.STATUS_CHOICES)
+
+# action: (statuses it may start from, new status, *_by field, *_at field)
+TRANSITIONS = {
+    'approve': (['PENDING'], 'APPROVED', 'approved_by', 'approved_at'),
+    'confirm': (['APPROVED'], 'CONFIRMED', 'confirmed_by', 'confirmed_at'),
+    'reject': (['PENDING', 'APPROVED'], 'REJECTED', 'rejected_by', 'rejected_at'),
+    'cancel': (['PENDING'], 'CANCELED', 'canceled_by', 'canceled_at'),
+}
+
+# Outcome codes of check_row(); the first four are the successful ones
+OUTCOME_LABELS = {
+    'approved': 'Đã duyệt',
+    'confirmed': 'Đã xác nhận',
+    'rejected': 'Đã từ chối',
+    'canceled': 'Đã hủy',
+    'missing': 'Không tồn tại',
+    'role': 'Vai trò của bạn không được thực hiện thao tác này',
+    'not_designated': 'Bạn không phải Lead được chỉ định của phiếu',
+    'not_owner': 'Không phải người tạo phiếu nên không thể hủy',
+    'status': 'Trạng thái hiện tại không cho phép thao tác này',
+    'finished': 'Đã hoàn tất hoặc từ chối/hủy rồi',
+    'no_reason': 'Thiếu lý do từ chối',
+}
+SUCCESS_CODES = ('approved', 'confirmed', 'rejected', 'canceled')
+
+
+class BulkResult:
+    """Outcome of a bulk action: the request ids grouped by outcome code, in posted order."""
+
+    def __init__(self, action, groups=None):
+        self.action = action
+        self.groups = groups if groups is not None else {}
+
+    def add(self, code, request_id):
+        self.groups.setdefault(code, []).append(request_id)
+
+    @property
+    def succeeded(self):
+        return sum(len(ids) for code, ids in self.groups.items() if code in SUCCESS_CODES)
+
+    @property
+    def skipped(self):
+        return sum(len(ids) for code, ids in self.groups.items() if code not in SUCCESS_CODES)
+
+    def codes(self):
+        """Codes present, successes first."""
+        return sorted(self.groups, key=lambda code: (code not in SUCCESS_CODES, list(OUTCOME_LABELS).index(code)))
+
+    def summary(self):
+        """[(code, label, ok, count)], successes first."""
+        return [
+            (code, OUTCOME_LABELS[code], code in SUCCESS_CODES, len(self.groups[code]))
+            for code in self.codes()
+        ]
+
+    def rows(self, code=None):
+        """[(code, request id)] of one code, or of all of them grouped in summary() order."""
+        codes = [code] if code else self.codes()
+        return [(c, rid) for c in codes for rid in self.groups.get(c, [])]
+
+    def to_dict(self):
+        return {'action': self.action, 'groups': self.groups}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['action'], data['groups'])
+
+
+def chunked(items, size=CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def batch_number_for(batch_id):
+    return f"PH{batch_id:05d}"
+
+
+def create_batch(created_by, designated_lead, description):
+    """Insert a batch and derive its number from the id it was given."""
+    batch = Batch.objects.create(
+        batch_number=f"TMP-{uuid.uuid4().hex}",
+        description=description,
+        created_by=created_by,
+        designated_lead=designated_lead,
+    )
+    batch.batch_number = batch_number_for(batch.id)
+    Batch.objects.filter(pk=batch.pk).update(batch_number=batch.batch_number)
+    return batch
+
+
+def insert_rows(batch, rows):
+    """INSERT request value dicts (ROW_FIELDS, `status` optional) into `batch`; returns the count.
+
+    Rows go in with a plain executemany() per chunk and their MSNVs are indexed
+    from the ids read back, without building a model instance per row. Call
+    publish_batch() once the batch has all of its rows.
+    """
+    ops = connection.ops
+    table = ops.quote_name(TransferRequest._meta.db_table)
+    sql = f'INSERT INTO {table} ({", ".join(INSERT_COLUMNS)}) VALUES ({", ".join(["%s"] * len(INSERT_COLUMNS))})'
+    now = ops.adapt_datetimefield_value(timezone.now())
+    lead_id = batch.designated_lead_id
+    last_id = batch.requests.aggregate(m=Max('id'))['m'] or 0
+    for chunk in chunked(rows):
+        params = []
+        for row in chunk:
+            status = row.get('status', 'PENDING')
+            params.append((
+                batch.id, row['msnv'], row['from_code'], row['to_code'], ops.adapt_datefield_value(row['effective_date']),
+                bool(row['is_permanent']), status, row['requested_by_id'], lead_id if status == 'PENDING' else None,
+                now, now,
+            ))
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+        # Neither backend returns the ids of an executemany(); they are the batch's newest
+        inserted = list(batch.requests.filter(id__gt=last_id).order_by('id').values_list('id', 'msnv'))
+        search.index_objects(SearchTerm.KIND_MSNV, inserted, replace=False)
+        last_id = inserted[-1][0]
+    return len(rows)
+
+
+def publish_batch(batch):
+    """Counters, change-feed events and cache bumps for a new batch whose rows are all inserted."""
+    grouped = batch.requests.order_by().values_list('status', 'requested_by_id').annotate(n=Count('id'))
+    counters.record_added_counts([
+        ({'batch_id': batch.id, 'batch__designated_lead_id': batch.designated_lead_id,
+          'requested_by_id': requester_id, 'status': status}, n)
+        for status, requester_id, n in grouped
+    ])
+    events.record_batch_created(batch.id)
+    transaction.on_commit(counts.invalidate)
+    transaction.on_commit(lambda: fragments.bump_batch_versions([batch.id]))
+
+
+def insert_requests(batch, requests):
+    """Insert unsaved TransferRequests into the new `batch` and publish it; returns the count.
+
+    The instances themselves are not saved (they get no pk).
+    """
+    count = insert_rows(batch, [{name: getattr(tr, name) for name in ROW_FIELDS} for tr in requests])
+    publish_batch(batch)
+    return count
+
+
+def check_row(action, role, user, row, reason):
+    """Return (ok, outcome code) for one locked row, mirroring the single-row views."""
+    status = row['status']
+    if action == 'approve':
+        lead_id = row['batch__designated_lead_id']
+        if role != 'LEAD':
+            return False, 'role'
+        if lead_id and lead_id != user.id:
+            return False, 'not_designated'
+        if status != 'PENDING':
+            return False, 'status'
+        return True, 'approved'
+    if action == 'confirm':
+        if role != 'DATA_PROCESSOR':
+            return False, 'role'
+        if status != 'APPROVED':
+            return False, 'status'
+        return True, 'confirmed'
+    if action == 'reject':
+        # DATA_PROCESSOR can only reject APPROVED, LEAD can only reject PENDING
+        if role == 'DATA_PROCESSOR' and status != 'APPROVED':
+            return False, 'status'
+        if role == 'LEAD' and status != 'PENDING':
+            return False, 'status'
+        if role not in ['LEAD', 'DATA_PROCESSOR']:
+            return False, 'role'
+        if status in ['CONFIRMED', 'REJECTED', 'CANCELED']:
+            return False, 'finished'
+        if not reason:
+            return False, 'no_reason'
+        return True, 'rejected'
+    # cancel
+    if role != 'SUPERVISOR':
+        return False, 'role'
+    if row['requested_by_id'] != user.id:
+        return False, 'not_owner'
+    if status != 'PENDING':
+        return False, 'status'
+    return True, 'canceled'
+
+
+def lock_rows(ids):
+    """Lock the selected rows (not the joined batch/user rows) and return them by id."""
+    rows = {}
+    # MariaDB has no FOR UPDATE OF; there the joined rows get locked as well
+    of = ('self',) if connection.features.has_select_for_update_of else ()
+    for chunk in chunked(ids):
+        qs = (
+            TransferRequest.objects.select_for_update(of=of)
+            .filter(id__in=chunk).order_by('id')
+            .values('id', 'msnv', 'status', 'requested_by_id', 'batch_id',
+                    'batch__designated_lead_id', 'batch__designated_lead__username')
+        )
+        rows.update((row['id'], row) for row in qs)
+    return rows
+
+
+def transition_values(action, user, reason=''):
+    _, new_status, by_field, at_field = TRANSITIONS[action]
+    now = timezone.now()
+    # No transition ends in PENDING, so the row always leaves the lead's inbox
+    values = {'status': new_status, by_field: user, at_field: now, 'updated_at': now, 'assignee': None}
+    if action == 'reject':
+        values['rejection_reason'] = reason
+    return values
+
+
+def apply_transition(action, user, ids, reason=''):
+    """One conditional UPDATE per chunk; returns the number of rows changed."""
+    expected = TRANSITIONS[action][0]
+    values = transition_values(action, user, reason)
+    changed = 0
+    for chunk in chunked(ids):
+        changed += TransferRequest.objects.filter(id__in=chunk, status__in=expected).update(**values)
+    return changed
+
+
+def after_transition(action, user, rows, reason=''):
+    """Derived-data updates for locked `rows` (lock_rows dicts, old status) that just moved."""
+    new_status = TRANSITIONS[action][1]
+    counters.record_transition(rows, new_status)
+    events.record_transition(rows, new_status, user.id, reason if action == 'reject' else '')
+    transaction.on_commit(counts.invalidate)
+    batch_ids = [row['batch_id'] for row in rows]
+    transaction.on_commit(lambda: fragments.bump_batch_versions(batch_ids))
+    if action == 'approve':
+        WorkflowActor.record(WorkflowActor.ACTION_APPROVED, [user.id])
+    elif action == 'confirm':
+        WorkflowActor.record(WorkflowActor.ACTION_CONFIRMED, [user.id])
+
+
+def transition(tr, action, user, role, reason=''):
+    """Apply `action` to one request the caller has already checked.
+
+    The rules of check_row() are applied again to the locked row, so the
+    designated lead is the one current at commit time. Returns False, changing
+    nothing, if the request's status is no longer the one the caller saw or
+    the locked row no longer allows the action (someone else changed it in
+    the meantime).
+    """
+    with transaction.atomic():
+        row = lock_rows([tr.id]).get(tr.id)
+        if row is None or row['status'] != tr.status or not check_row(action, role, user, row, reason)[0]:
+            return False
+        values = transition_values(action, user, reason)
+        TransferRequest.objects.filter(id=tr.id).update(**values)
+        after_transition(action, user, [row], reason)
+    for name, value in values.items():
+        setattr(tr, name, value)
+    return True
+
+
+def bulk_transition(user, role, action, raw_ids, reason=''):
+    """Run `action` over `raw_ids`; returns a BulkResult."""
+    ids = []
+    for rid in raw_ids:
+        try:
+            ids.append(int(rid))
+        except (TypeError, ValueError):
+            ids.append(rid)
+    result = BulkResult(action)
+    allowed = []
+    with transaction.atomic():
+        rows = lock_rows(sorted({rid for rid in ids if isinstance(rid, int)}))
+        seen = set()
+        for rid in ids:
+            if rid in seen:
+                continue
+            seen.add(rid)
+            row = rows.get(rid)
+            if row is None:
+                result.add('missing', rid)
+                continue
+            ok, code = check_row(action, role, user, row, reason)
+            result.add(code, rid)
+            if ok:
+                allowed.append(rid)
+        if allowed:
+            apply_transition(action, user, allowed, reason)
+            after_transition(action, user, [rows[rid] for rid in allowed], reason)
+    return result